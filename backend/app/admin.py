@@ -80,9 +80,10 @@ class RecipeAdmin(admin.ModelAdmin):
     display_tags.short_description = "Tags"
 
     def get_favorite_count(self, obj):
-        return obj.recipe_favorite_recipes.count()
+        return obj.favorites_count
 
     get_favorite_count.short_description = "В избранном"
+    get_favorite_count.admin_order_field = "favorites_count"
 
 
 @admin.register(Favorite)
@@ -0,0 +1,166 @@
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from threading import Lock
+
+from app.models import Ingredient
+from app.versions import INGREDIENTS_VERSION, get_version
+
+NGRAM_SIZE = 3
+PREFIX_END = '\U0010ffff'
+WORD = re.compile(r'[^\W_]+')
+
+
+def get_trigrams(text):
+    """
+    Функция разбиения строки на триграммы так же, как pg_trgm:
+    по словам из букв и цифр в нижнем регистре, с двумя пробелами
+    в начале и одним в конце каждого слова.
+    """
+    trigrams = set()
+    for word in WORD.findall(text.casefold()):
+        word = f'  {word} '
+        trigrams.update(
+            word[start:start + NGRAM_SIZE]
+            for start in range(len(word) - NGRAM_SIZE + 1)
+        )
+    return trigrams
+
+
+class IngredientIndex:
+    """
+    Индекс ингредиентов в памяти процесса.
+    Совпадения по началу названия ищутся бинарным поиском
+    в отсортированном массиве, вхождения - по n-граммам названий.
+    Сходство с запросом считается по триграммам слов, как
+    similarity() из pg_trgm.
+    """
+    def __init__(self, ingredients):
+        rows = sorted(
+            (
+                (name.casefold(), {
+                    'id': pk,
+                    'name': name,
+                    'measurement_unit': measurement_unit,
+                })
+                for pk, name, measurement_unit in ingredients
+            ),
+            key=lambda row: (row[0], row[1]['id'])
+        )
+        self.keys = [key for key, _ in rows]
+        self.rows = [row for _, row in rows]
+        self.ngrams = defaultdict(list)
+        self.trigrams = defaultdict(list)
+        self.trigram_counts = []
+
+        for position, key in enumerate(self.keys):
+            for ngram in {
+                key[start:start + NGRAM_SIZE]
+                for start in range(len(key) - NGRAM_SIZE + 1)
+            }:
+                self.ngrams[ngram].append(position)
+
+            trigrams = get_trigrams(key)
+            self.trigram_counts.append(len(trigrams))
+            for trigram in trigrams:
+                self.trigrams[trigram].append(position)
+
+    def prefix_range(self, query):
+        return (
+            bisect_left(self.keys, query),
+            bisect_left(self.keys, query + PREFIX_END),
+        )
+
+    def contains_positions(self, query):
+        if len(query) < NGRAM_SIZE:
+            return range(len(self.keys))
+
+        postings = sorted(
+            (
+                self.ngrams.get(query[start:start + NGRAM_SIZE], ())
+                for start in range(len(query) - NGRAM_SIZE + 1)
+            ),
+            key=len
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+        return candidates
+
+    def similarities(self, query):
+        """
+        Сходство названий с запросом: доля общих триграмм от их
+        объединения. Названия без общих триграмм в словарь не попадают.
+        """
+        query_trigrams = get_trigrams(query)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.trigrams.get(trigram, ()))
+        return {
+            position: count / (
+                len(query_trigrams) + self.trigram_counts[position] - count
+            )
+            for position, count in shared.items()
+        }
+
+    def search(self, query):
+        """
+        Сначала совпадения по началу названия, затем по вхождению;
+        внутри групп - по убыванию сходства, длине названия и id,
+        как в запросе к PostgreSQL в IngredientFilter.
+        """
+        query = query.casefold()
+        similarities = self.similarities(query)
+
+        def result_order(position):
+            row = self.rows[position]
+            return (
+                -similarities.get(position, 0), len(row['name']), row['id']
+            )
+
+        start, end = self.prefix_range(query)
+        prefix = sorted(range(start, end), key=result_order)
+        contains = sorted(
+            (
+                position
+                for position in self.contains_positions(query)
+                if not start <= position < end
+                and query in self.keys[position]
+            ),
+            key=result_order
+        )
+        return [self.rows[position] for position in prefix + contains]
+
+
+class IngredientAutocomplete:
+    """
+    Ленивая загрузка индекса ингредиентов и его перестроение
+    после изменения справочника.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.index = None
+        self.version = None
+
+    def get_index(self):
+        version = get_version(INGREDIENTS_VERSION)
+        if self.index is None or self.version != version:
+            with self.lock:
+                if self.index is None or self.version != version:
+                    self.index = IngredientIndex(
+                        Ingredient.objects.values_list(
+                            'id', 'name', 'measurement_unit'
+                        ).iterator()
+                    )
+                    self.version = version
+        return self.index
+
+    def search(self, query):
+        return self.get_index().search(query)
+
+    def invalidate(self):
+        with self.lock:
+            self.index = None
+
+
+ingredient_autocomplete = IngredientAutocomplete()
@@ -0,0 +1,8 @@
+def delete_rows(queryset):
+    """
+    Функция удаления строк одним запросом DELETE без чтения
+    объектов и без сигналов pre_delete/post_delete. Подходит только
+    для таблиц без зависимых строк: каскадное удаление не выполняется.
+    Возвращает число удаленных строк.
+    """
+    return queryset._raw_delete(queryset.db)
@@ -0,0 +1,168 @@
+from collections import Counter, defaultdict
+
+from app.models import RecipeIngredients, Shopping, ShoppingCartItem
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Sum, Value, When
+from django.db.models.functions import Greatest
+
+
+def get_recipe_amounts(recipe_ids):
+    """
+    Функция суммирования количества ингредиентов в рецептах.
+    """
+    return Counter(dict(
+        RecipeIngredients.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values_list('ingredient_id').annotate(
+            total=Sum('amount')
+        ).order_by()
+    ))
+
+
+def get_shopping_items(user):
+    """
+    Функция чтения сводного списка покупок для выгрузки.
+    """
+    return ShoppingCartItem.objects.filter(
+        user=user
+    ).values_list(
+        'ingredient__name',
+        'ingredient__measurement_unit',
+        'total_amount',
+    ).order_by('ingredient__name')
+
+
+def change_cart_items(user_ids, deltas):
+    """
+    Функция изменения сводного списка покупок пользователей
+    на заданные разности по ингредиентам. Недостающие строки
+    создаются, строки с нулевым количеством удаляются.
+    """
+    user_ids = list(user_ids)
+    deltas = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items() if delta
+    }
+    if not user_ids or not deltas:
+        return
+
+    with transaction.atomic():
+        added = [
+            ingredient_id
+            for ingredient_id, delta in deltas.items() if delta > 0
+        ]
+        if added:
+            ShoppingCartItem.objects.bulk_create(
+                [
+                    ShoppingCartItem(user_id=user_id, ingredient_id=ingredient)
+                    for user_id in user_ids
+                    for ingredient in added
+                ],
+                ignore_conflicts=True
+            )
+
+        items = ShoppingCartItem.objects.filter(
+            user_id__in=user_ids,
+            ingredient_id__in=deltas
+        )
+        items.update(total_amount=Greatest(
+            Case(
+                *(
+                    When(
+                        ingredient_id=ingredient_id,
+                        then=F('total_amount') + Value(delta)
+                    )
+                    for ingredient_id, delta in deltas.items()
+                ),
+                default=F('total_amount'),
+                output_field=PositiveIntegerField()
+            ),
+            Value(0)
+        ))
+        items.filter(total_amount=0).delete()
+
+
+def change_recipe_in_carts(recipe_id, deltas):
+    """
+    Функция изменения списков покупок всех пользователей,
+    у которых рецепт находится в корзине.
+    """
+    change_cart_items(
+        Shopping.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('user_id', flat=True),
+        deltas
+    )
+
+
+def get_expected_cart_items(user_ids):
+    """
+    Функция расчета сводных списков покупок по корзинам.
+    Возвращает словарь {пользователь: {ингредиент: количество}}.
+    """
+    expected = defaultdict(dict)
+    totals = RecipeIngredients.objects.filter(
+        recipe__recipe_shopping_recipes__user_id__in=user_ids
+    ).values_list(
+        'recipe__recipe_shopping_recipes__user_id',
+        'ingredient_id',
+    ).annotate(
+        total=Sum('amount')
+    ).order_by()
+
+    for user_id, ingredient_id, total in totals:
+        expected[user_id][ingredient_id] = total
+    return expected
+
+
+def get_stored_cart_items(user_ids):
+    """
+    Функция чтения сохраненных сводных списков покупок
+    в том же виде, что и get_expected_cart_items.
+    """
+    stored = defaultdict(dict)
+    items = ShoppingCartItem.objects.filter(
+        user_id__in=user_ids
+    ).values_list('user_id', 'ingredient_id', 'total_amount')
+
+    for user_id, ingredient_id, total in items:
+        stored[user_id][ingredient_id] = total
+    return stored
+
+
+def rebuild_cart_items(user_ids, expected=None):
+    """
+    Функция полного перестроения сводных списков покупок.
+    """
+    user_ids = list(user_ids)
+    if expected is None:
+        expected = get_expected_cart_items(user_ids)
+
+    with transaction.atomic():
+        ShoppingCartItem.objects.filter(user_id__in=user_ids).delete()
+        ShoppingCartItem.objects.bulk_create(
+            ShoppingCartItem(
+                user_id=user_id,
+                ingredient_id=ingredient_id,
+                total_amount=total
+            )
+            for user_id, totals in expected.items()
+            for ingredient_id, total in totals.items()
+        )
+
+
+def sync_cart_items(user_ids):
+    """
+    Функция приведения сводных списков покупок к корзинам
+    изменением только расходящихся строк. В отличие от
+    rebuild_cart_items не удаляет список целиком, поэтому
+    безопасна при параллельных изменениях корзины.
+    """
+    user_ids = list(user_ids)
+    expected = get_expected_cart_items(user_ids)
+    stored = get_stored_cart_items(user_ids)
+
+    for user_id in user_ids:
+        totals = Counter(expected[user_id])
+        totals.subtract(stored[user_id])
+        change_cart_items([user_id], totals)
@@ -0,0 +1,46 @@
+from collections import Counter
+
+from app.models import Favorite, Recipe, Shopping
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+COUNTER_FIELDS = {
+    Favorite: 'favorites_count',
+    Shopping: 'in_carts_count',
+}
+
+
+def change_counters(model, recipe_ids, delta=1):
+    """
+    Функция изменения счетчиков рецептов выражением F()
+    без чтения строк. Рецепты с одинаковым изменением
+    обновляются одним запросом.
+    """
+    field = COUNTER_FIELDS[model]
+    groups = {}
+    for recipe_id, times in Counter(recipe_ids).items():
+        groups.setdefault(times * delta, []).append(recipe_id)
+
+    for change, ids in groups.items():
+        Recipe.objects.filter(pk__in=ids).update(
+            **{field: Greatest(F(field) + change, Value(0))}
+        )
+
+
+def recompute_counters(recipes=None):
+    """
+    Функция пересчета счетчиков по таблицам избранного
+    и списков покупок. Возвращает число обновленных рецептов.
+    """
+    if recipes is None:
+        recipes = Recipe.objects.all()
+
+    counters = {}
+    for model, field in COUNTER_FIELDS.items():
+        counted = model.objects.filter(
+            recipe=OuterRef('pk')
+        ).order_by().values('recipe').annotate(total=Count('pk'))
+        counters[field] = Coalesce(
+            Subquery(counted.values('total')), Value(0)
+        )
+    return recipes.update(**counters)
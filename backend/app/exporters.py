@@ -0,0 +1,100 @@
+import csv
+import json
+
+from app.generate_shopping_cart import (AMOUNT_INGREDIENT, NAME_INGREDIENT,
+                                        UNIT_INGREDIENT,
+                                        generate_shopping_list)
+from django.db.models import QuerySet
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+class Echo:
+    """
+    Буфер для csv.writer, возвращающий записанную строку.
+    """
+    def write(self, value):
+        return value
+
+
+class ShoppingListExporter:
+    """
+    Базовый класс выгрузки списка покупок.
+    """
+    format = None
+    media_type = None
+    cacheable = False
+
+    def export(self, shopping_items: QuerySet):
+        raise NotImplementedError
+
+    @staticmethod
+    def iterate(shopping_items: QuerySet):
+        if isinstance(shopping_items, QuerySet):
+            return shopping_items.iterator()
+        return iter(shopping_items)
+
+
+class PdfExporter(ShoppingListExporter):
+    format = 'pdf'
+    media_type = 'application/pdf'
+    cacheable = True
+
+    def export(self, shopping_items: QuerySet):
+        with generate_shopping_list(shopping_items) as pdf_file:
+            for chunk in iter(lambda: pdf_file.read(FILE_CHUNK_SIZE), b''):
+                yield chunk
+
+
+class CsvExporter(ShoppingListExporter):
+    format = 'csv'
+    media_type = 'text/csv; charset=utf-8'
+
+    def export(self, shopping_items: QuerySet):
+        writer = csv.writer(Echo())
+        yield writer.writerow(
+            ('Ингредиент', 'Количество', 'Единица измерения')
+        ).encode()
+
+        for shopping_item in self.iterate(shopping_items):
+            yield writer.writerow((
+                shopping_item[NAME_INGREDIENT],
+                shopping_item[AMOUNT_INGREDIENT],
+                shopping_item[UNIT_INGREDIENT],
+            )).encode()
+
+
+class TxtExporter(ShoppingListExporter):
+    format = 'txt'
+    media_type = 'text/plain; charset=utf-8'
+
+    def export(self, shopping_items: QuerySet):
+        yield 'Список покупок:\n'.encode()
+
+        for shopping_item in self.iterate(shopping_items):
+            yield (f"• {shopping_item[NAME_INGREDIENT]} - "
+                   f"{shopping_item[AMOUNT_INGREDIENT]} "
+                   f"{shopping_item[UNIT_INGREDIENT]}\n").encode()
+
+
+class JsonExporter(ShoppingListExporter):
+    format = 'json'
+    media_type = 'application/json'
+
+    def export(self, shopping_items: QuerySet):
+        separator = '['
+        for shopping_item in self.iterate(shopping_items):
+            yield (separator + json.dumps({
+                'name': shopping_item[NAME_INGREDIENT],
+                'measurement_unit': shopping_item[UNIT_INGREDIENT],
+                'amount': shopping_item[AMOUNT_INGREDIENT],
+            }, ensure_ascii=False)).encode()
+            separator = ','
+
+        yield ('[]' if separator == '[' else ']').encode()
+
+
+EXPORTERS = {
+    exporter.format: exporter()
+    for exporter in (PdfExporter, CsvExporter, TxtExporter, JsonExporter)
+}
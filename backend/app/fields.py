@@ -0,0 +1,149 @@
+import base64
+import binascii
+import os
+import re
+from tempfile import SpooledTemporaryFile
+
+from app.storage import recipe_image_storage
+from django.conf import settings
+from django.core.files import File
+from PIL import Image, UnidentifiedImageError
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+DATA_URI_RE = re.compile(r'^data:image/(?P<format>[\w.+-]+);base64,')
+ALLOWED_IMAGE_FORMATS = ('jpeg', 'jpg', 'png', 'gif', 'webp')
+DECODE_CHUNK_SIZE = 64 * 1024
+WHITESPACE_RE = re.compile(r'\s+')
+VERIFY_DRAFT_SIZE = (256, 256)
+RIFF_SIZE_OFFSET = 4
+RIFF_HEADER_SIZE = 8
+GIF_TRAILER = b';'
+
+
+class StreamingBase64ImageField(serializers.ImageField):
+    """
+    Изображение в base64, которое декодируется частями
+    во временный файл без полной копии в памяти. До передачи
+    в фоновую обработку по заголовку файла проверяются формат
+    и размеры, поэтому сжатые бомбы отклоняются без распаковки.
+    """
+    default_error_messages = {
+        'invalid': 'Изображение должно быть строкой base64.',
+        'invalid_image': 'Файл не является изображением.',
+        'invalid_format': 'Формат изображения {format} не поддерживается.',
+        'too_large': 'Размер изображения больше {max_size} байт.',
+        'too_many_pixels': (
+            'Изображение больше {max_pixels} пикселей.'
+        ),
+    }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str) or not data:
+            self.fail('invalid')
+
+        # Заголовок data-URI пропускается смещением: срез строки
+        # скопировал бы весь текст изображения.
+        offset = 0
+        match = DATA_URI_RE.match(data)
+        if match:
+            if match['format'].lower() not in ALLOWED_IMAGE_FORMATS:
+                self.fail('invalid_format', format=match['format'])
+            offset = match.end()
+
+        max_size = settings.RECIPE_IMAGE_MAX_SIZE
+        if (len(data) - offset) // 4 * 3 > max_size:
+            self.fail('too_large', max_size=max_size)
+
+        image_file = SpooledTemporaryFile(
+            max_size=settings.RECIPE_IMAGE_SPOOL_SIZE
+        )
+        try:
+            image_format = self.decode(data, offset, image_file)
+        except ValidationError:
+            image_file.close()
+            raise
+
+        image_file.seek(0)
+        return File(image_file, name=f'image.{image_format}')
+
+    def decode(self, data, offset, image_file):
+        """
+        Декодирование base64 частями. Пробелы и переводы строк
+        пропускаются, неполная четверка символов переносится
+        в следующую часть.
+        """
+        tail = ''
+        try:
+            for start in range(offset, len(data), DECODE_CHUNK_SIZE):
+                chunk = tail + WHITESPACE_RE.sub(
+                    '', data[start:start + DECODE_CHUNK_SIZE]
+                )
+                end = len(chunk) // 4 * 4
+                image_file.write(base64.b64decode(chunk[:end], validate=True))
+                tail = chunk[end:]
+            if tail:
+                raise ValueError('Неполная последняя группа base64.')
+        except (binascii.Error, ValueError):
+            self.fail('invalid')
+
+        image_file.seek(0)
+        max_pixels = settings.RECIPE_IMAGE_MAX_PIXELS
+        try:
+            with Image.open(image_file) as image:
+                image_format = (image.format or '').lower()
+                width, height = image.size
+                if image_format not in ALLOWED_IMAGE_FORMATS:
+                    self.fail('invalid_format', format=image_format)
+                if width * height > max_pixels:
+                    self.fail('too_many_pixels', max_pixels=max_pixels)
+                self.verify(image, image_file)
+        except Image.DecompressionBombError:
+            self.fail('too_many_pixels', max_pixels=max_pixels)
+        except (UnidentifiedImageError, OSError, SyntaxError, EOFError):
+            self.fail('invalid_image')
+        return image_format
+
+    def verify(self, image, image_file):
+        """
+        Проверка целостности файла с ограниченными затратами памяти,
+        чтобы обрезанный файл отклонялся в запросе, а не в фоновой
+        обработке. PNG проверяется по контрольным суммам блоков
+        без распаковки, JPEG читается в уменьшенном масштабе.
+        WebP и GIF не распаковываются: у них сверяются размер
+        из заголовка RIFF и завершающий байт, остальные ошибки
+        данных получат статус failed при фоновой обработке.
+        """
+        if image.format == 'PNG':
+            image.verify()
+        elif image.format == 'JPEG':
+            image.draft('RGB', VERIFY_DRAFT_SIZE)
+            image.load()
+        elif image.format == 'WEBP':
+            image_file.seek(RIFF_SIZE_OFFSET)
+            riff_size = int.from_bytes(image_file.read(4), 'little')
+            if image_file.seek(0, os.SEEK_END) < RIFF_HEADER_SIZE + riff_size:
+                raise SyntaxError('Файл WebP короче размера в заголовке.')
+        elif image.format == 'GIF':
+            image_file.seek(-1, os.SEEK_END)
+            if image_file.read(1) != GIF_TRAILER:
+                raise SyntaxError('Файл GIF не завершен.')
+
+
+class ThumbnailsField(serializers.ReadOnlyField):
+    """
+    Ссылки на уменьшенные копии изображения по ширине и формату.
+    Пока изображение обрабатывается, объект пуст, а состояние
+    обработки отдается в поле image_status.
+    """
+    def to_representation(self, value):
+        request = self.context.get('request')
+        thumbnails = {}
+        for width, files in (value or {}).items():
+            thumbnails[width] = {}
+            for extension, name in files.items():
+                url = recipe_image_storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                thumbnails[width][extension] = url
+        return thumbnails
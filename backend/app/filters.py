@@ -1,5 +1,10 @@
-from app.models import Ingredient, Recipe
+from app.models import Favorite, Ingredient, Recipe, Shopping
+from django import forms
+from django.db import connections
+from django.db.models import BooleanField, Case, Exists, OuterRef, Value, When
+from django.db.models.functions import Length, Upper
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 from users.models import User
 
 RECIPE_CHOICE = (
@@ -8,8 +13,41 @@ RECIPE_CHOICE = (
 )
 
 
+class AnySlugMultipleField(forms.MultipleChoiceField):
+    """
+    Поле со списком значений без проверки по списку вариантов.
+    """
+    def valid_value(self, value):
+        return True
+
+
+class SlugMultipleFilter(filters.MultipleChoiceFilter):
+    field_class = AnySlugMultipleField
+
+
 class IngredientFilter(filters.FilterSet):
-    name = filters.CharFilter(lookup_expr='istartswith')
+    name = filters.CharFilter(method='filter_name')
+
+    def filter_name(self, queryset, name, value):
+        """
+        Сначала совпадения по началу названия, затем по вхождению;
+        внутри групп на PostgreSQL - по убыванию триграммного сходства,
+        затем по длине названия и id, как в индексе автодополнения
+        в памяти. На других базах сходство не учитывается.
+        """
+        queryset = queryset.filter(name__icontains=value).annotate(
+            is_prefix=Case(
+                When(name__istartswith=value, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField()
+            )
+        )
+        if connections[queryset.db].vendor == 'postgresql':
+            from django.contrib.postgres.search import TrigramSimilarity
+            return queryset.annotate(
+                similarity=TrigramSimilarity(Upper('name'), value.upper())
+            ).order_by('-is_prefix', '-similarity', Length('name'), 'id')
+        return queryset.order_by('-is_prefix', Length('name'), 'id')
 
     class Meta:
         model = Ingredient
@@ -28,24 +66,34 @@ class RecipeFilter(filters.FilterSet):
         choices=RECIPE_CHOICE,
         method='filter_is_in_shopping_cart'
     )
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = SlugMultipleFilter(method='filter_tags')
 
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
         if user.is_authenticated and value == '1':
-            queryset = queryset.filter(
-                recipe_favorite_recipes__user=user
-            )
+            queryset = queryset.filter(Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ))
         return queryset
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         user = self.request.user
         if user.is_authenticated and value == '1':
-            queryset = queryset.filter(
-                recipe_shopping_recipes__user=user
-            )
+            queryset = queryset.filter(Exists(
+                Shopping.objects.filter(user=user, recipe=OuterRef('pk'))
+            ))
         return queryset
 
+    def filter_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(Exists(
+            Recipe.tags.through.objects.filter(
+                recipe=OuterRef('pk'),
+                tag__slug__in=value
+            )
+        ))
+
     class Meta:
         model = Recipe
         fields = (
@@ -54,3 +102,17 @@ class RecipeFilter(filters.FilterSet):
             'is_in_shopping_cart',
             'tags'
         )
+
+
+class RecipeOrderingFilter(OrderingFilter):
+    """
+    Сортировка рецептов по счетчикам с дополнительной сортировкой
+    по id, чтобы порядок страниц был устойчивым при равных значениях.
+    """
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(
+            field.lstrip('-') in ('id', 'pk') for field in ordering
+        ):
+            ordering = (*ordering, '-id')
+        return ordering
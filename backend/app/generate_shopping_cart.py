@@ -1,5 +1,8 @@
-from io import BytesIO
+import os
+from tempfile import SpooledTemporaryFile
+from threading import Lock
 
+from django.conf import settings
 from django.db.models import QuerySet
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfbase import pdfmetrics
@@ -10,42 +13,108 @@ NAME_INGREDIENT = 0
 AMOUNT_INGREDIENT = 2
 UNIT_INGREDIENT = 1
 
+FONT_NAME = "DejaVuSerif"
+FONT_FILE = "DejaVuSerif.ttf"
+HEADER_FORM = "shopping_list_header"
+LINE_HEIGHT = 20
+PAGE_TOP = 670
+PAGE_BOTTOM = 60
+SPOOL_MAX_SIZE = 1024 * 1024
 
-def generate_shopping_list(shopping_items: QuerySet):
+font_lock = Lock()
+
+
+def register_fonts():
     """
-    Функция генерации PDF-файла.
+    Функция регистрации шрифтов один раз на процесс.
     """
-    pdf_buffer = BytesIO()
-    pdf_canvas = canvas.Canvas(pdf_buffer, pagesize=letter)
-    pdfmetrics.registerFont(
-        TTFont(
-            "DejaVuSerif",
-            "DejaVuSerif.ttf",
-            "UTF-8")
-    )
+    if FONT_NAME in pdfmetrics.getRegisteredFontNames():
+        return
 
-    pdf_canvas.setFont("DejaVuSerif", 16)
+    with font_lock:
+        if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(
+                TTFont(
+                    FONT_NAME,
+                    os.path.join(settings.BASE_DIR, FONT_FILE),
+                    "UTF-8")
+            )
+
+
+def draw_header(pdf_canvas: canvas.Canvas):
+    """
+    Функция отрисовки заголовка страницы.
+    Заголовок один раз записывается в документ как form XObject,
+    а на каждой странице выводится ссылкой на него.
+    """
+    if not pdf_canvas.hasForm(HEADER_FORM):
+        pdf_canvas.beginForm(HEADER_FORM)
+        draw_header_content(pdf_canvas)
+        pdf_canvas.endForm()
+
+    pdf_canvas.doForm(HEADER_FORM)
+
+
+def draw_header_content(pdf_canvas: canvas.Canvas):
+    """
+    Функция отрисовки статичного содержимого заголовка.
+    """
+    pdf_canvas.setFont(FONT_NAME, 16)
     pdf_canvas.drawString(200, 750, "Продуктовый помощник")
 
     page_width, _ = letter
     line_y = 730
     pdf_canvas.line(100, 730, page_width - 100, line_y)
 
-    pdf_canvas.setFont("DejaVuSerif", 13)
+    pdf_canvas.setFont(FONT_NAME, 13)
     pdf_canvas.drawString(100, 700, "Список покупок:")
 
-    pdf_canvas.setFont("DejaVuSerif", 10)
-    line = 670
+
+def draw_page_number(pdf_canvas: canvas.Canvas):
+    """
+    Функция отрисовки номера страницы.
+    """
+    page_width, _ = letter
+    pdf_canvas.setFont(FONT_NAME, 8)
+    pdf_canvas.drawCentredString(
+        page_width / 2, PAGE_BOTTOM / 2, str(pdf_canvas.getPageNumber())
+    )
+
+
+def generate_shopping_list(shopping_items: QuerySet):
+    """
+    Функция генерации многостраничного PDF-файла.
+    Возвращает временный файл для потоковой отдачи.
+    """
+    pdf_file = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    pdf_canvas = canvas.Canvas(pdf_file, pagesize=letter, pageCompression=1)
+    register_fonts()
+
+    draw_header(pdf_canvas)
+    pdf_canvas.setFont(FONT_NAME, 10)
+    line = PAGE_TOP
+
+    if isinstance(shopping_items, QuerySet):
+        shopping_items = shopping_items.iterator()
 
     for shopping_item in shopping_items:
+        if line < PAGE_BOTTOM:
+            draw_page_number(pdf_canvas)
+            pdf_canvas.showPage()
+            draw_header(pdf_canvas)
+            pdf_canvas.setFont(FONT_NAME, 10)
+            line = PAGE_TOP
+
         pdf_canvas.drawString(
             120, line,
             (f"• {shopping_item[NAME_INGREDIENT]} - "
              f"{shopping_item[AMOUNT_INGREDIENT]} "
              f"{shopping_item[UNIT_INGREDIENT]}")
         )
-        line -= 20
+        line -= LINE_HEIGHT
 
+    draw_page_number(pdf_canvas)
     pdf_canvas.save()
+    pdf_file.seek(0)
 
-    return pdf_buffer
+    return pdf_file
@@ -0,0 +1,155 @@
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+from threading import Lock
+
+from app.models import Recipe
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+THUMBNAIL_DIR = 'recipe/thumbnails/'
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    """
+    Функция ленивого создания пула потоков обработки изображений.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.RECIPE_IMAGE_WORKERS,
+                    thread_name_prefix='recipe-images'
+                )
+    return _executor
+
+
+def make_thumbnails(image_file, storage, name):
+    """
+    Функция создания уменьшенных копий фиксированной ширины
+    в форматах WebP и JPEG. Копии шире оригинала не создаются.
+    Копии строятся от большей к меньшей из одного кадра,
+    JPEG при этом сразу читается в уменьшенном масштабе.
+    """
+    stem = PurePosixPath(name).stem
+    widths = sorted(settings.RECIPE_THUMBNAIL_WIDTHS)
+
+    with Image.open(image_file) as image:
+        original_width, original_height = image.size
+        widths = [
+            width for width in widths if width <= original_width
+        ] or widths[:1]
+        image.draft('RGB', (
+            widths[-1],
+            max(1, original_height * widths[-1] // original_width)
+        ))
+        current = image.convert('RGB')
+
+    thumbnails = {}
+    for width in reversed(widths):
+        current.thumbnail((width, current.height), Image.LANCZOS)
+        thumbnails[str(width)] = {}
+        for extension, (image_format, options) in THUMBNAIL_FORMATS.items():
+            buffer = BytesIO()
+            current.save(buffer, image_format, **options)
+            thumbnails[str(width)][extension] = storage.save(
+                f'{THUMBNAIL_DIR}{stem}_{width}.{extension}',
+                ContentFile(buffer.getvalue())
+            )
+    return {str(width): thumbnails[str(width)] for width in widths}
+
+
+def save_recipe_image(image_file):
+    """
+    Функция сохранения оригинала изображения рецепта. Вызывается
+    в запросе: в фоне создаются только уменьшенные копии, поэтому
+    перезапуск процесса не теряет загруженный файл.
+    """
+    field = Recipe._meta.get_field('image')
+    extension = PurePosixPath(image_file.name).suffix
+    with image_file:
+        return field.storage.save(
+            field.generate_filename(None, f'{uuid.uuid4()}{extension}'),
+            image_file
+        )
+
+
+def process_recipe_image(recipe_id):
+    """
+    Функция обработки изображения рецепта: создает уменьшенные
+    копии сохраненного оригинала и записывает их в рецепт.
+    Если такой же файл уже есть у другого рецепта, его копии
+    используются повторно. При ошибке рецепт получает статус
+    failed, который видят клиенты. Результат не записывается,
+    если за время обработки изображение рецепта заменили.
+    """
+    name = Recipe.objects.filter(
+        pk=recipe_id
+    ).values_list('image', flat=True).first()
+    if not name:
+        return
+    recipe = Recipe.objects.filter(pk=recipe_id, image=name)
+
+    try:
+        storage = Recipe._meta.get_field('image').storage
+        thumbnails = Recipe.objects.filter(
+            image=name
+        ).exclude(
+            thumbnails={}
+        ).values_list('thumbnails', flat=True).first()
+        if thumbnails is None:
+            with storage.open(name) as image_file:
+                thumbnails = make_thumbnails(image_file, storage, name)
+        else:
+            for files in thumbnails.values():
+                for thumbnail in files.values():
+                    storage.touch(thumbnail)
+        recipe.update(
+            thumbnails=thumbnails,
+            image_status=Recipe.ImageStatus.ready
+        )
+    except Exception:
+        logger.exception(
+            'Не удалось обработать изображение рецепта %s.', recipe_id
+        )
+        recipe.update(image_status=Recipe.ImageStatus.failed)
+
+
+def run_in_worker(recipe_id):
+    """
+    Обработка изображения в потоке пула с закрытием
+    соединения с базой этого потока.
+    """
+    try:
+        process_recipe_image(recipe_id)
+    finally:
+        connection.close()
+
+
+def schedule_recipe_image(recipe_id):
+    """
+    Функция постановки создания уменьшенных копий в очередь
+    после фиксации транзакции с рецептом. Задачи, потерянные
+    при перезапуске, повторяет команда reprocess_recipe_images.
+    """
+    if settings.RECIPE_IMAGE_PROCESSING_SYNC:
+        transaction.on_commit(lambda: process_recipe_image(recipe_id))
+        return
+
+    transaction.on_commit(
+        lambda: get_executor().submit(run_in_worker, recipe_id)
+    )
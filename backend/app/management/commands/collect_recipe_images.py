@@ -0,0 +1,106 @@
+import posixpath
+from datetime import timedelta
+
+from app.images import THUMBNAIL_DIR
+from app.models import Recipe
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+def walk(storage, directory):
+    """
+    Рекурсивный обход каталога хранилища с выдачей имен файлов.
+    """
+    if not storage.exists(directory):
+        return
+    directories, files = storage.listdir(directory)
+    for filename in files:
+        yield posixpath.join(directory, filename)
+    for subdirectory in directories:
+        yield from walk(storage, posixpath.join(directory, subdirectory))
+
+
+def get_referenced_names(chunk_size):
+    """
+    Потоковое чтение имен изображений и уменьшенных копий,
+    на которые ссылаются рецепты.
+    """
+    referenced = set()
+    rows = Recipe.objects.values_list('image', 'thumbnails').iterator(
+        chunk_size=chunk_size
+    )
+    for image, thumbnails in rows:
+        if image:
+            referenced.add(image)
+        for files in (thumbnails or {}).values():
+            referenced.update(files.values())
+    return referenced
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаление файлов изображений рецептов, '
+        'на которые не ссылается ни один рецепт.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=60 * 60,
+            help=(
+                'Не удалять файлы моложе указанного числа секунд: '
+                'их рецепт может еще обрабатываться.'
+            )
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены.'
+        )
+
+    def handle(self, *args, **options):
+        field = Recipe._meta.get_field('image')
+        storage = field.storage
+        upload_to = field.upload_to.rstrip('/')
+        started = timezone.now()
+        threshold = started - timedelta(seconds=options['min_age'])
+        referenced = get_referenced_names(options['chunk_size'])
+
+        checked = 0
+        candidates = []
+        for directory in (upload_to, THUMBNAIL_DIR.rstrip('/')):
+            for name in walk(storage, directory):
+                checked += 1
+                if name in referenced:
+                    continue
+                if storage.get_modified_time(name) > threshold:
+                    continue
+                candidates.append(name)
+
+        if candidates and not options['dry_run']:
+            # Пока шел обход, рецепт мог сослаться на файл,
+            # а обработчик изображений - обновить время его изменения.
+            referenced = get_referenced_names(options['chunk_size'])
+
+        removed = 0
+        for name in candidates:
+            if options['dry_run']:
+                self.stdout.write(name)
+                removed += 1
+                continue
+            if name in referenced:
+                continue
+            try:
+                if storage.get_modified_time(name) > threshold:
+                    continue
+            except FileNotFoundError:
+                continue
+            storage.delete(name)
+            removed += 1
+
+        action = 'к удалению' if options['dry_run'] else 'удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено файлов: {checked}, {action}: {removed}.'
+        ))
@@ -0,0 +1,91 @@
+from app.bulk import delete_rows
+from app.cart_items import sync_cart_items
+from app.models import Ingredient, Recipe, RecipeIngredients, Shopping
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+def get_replacements():
+    """
+    Функция поиска повторяющихся ингредиентов. Возвращает словарь
+    {повтор: первый ингредиент с тем же названием и единицей}.
+    """
+    first_ids = {}
+    replacements = {}
+    ingredients = Ingredient.objects.order_by('id').values_list(
+        'id', 'name', 'measurement_unit'
+    )
+    for ingredient_id, name, measurement_unit in ingredients:
+        key = (name, measurement_unit)
+        first_id = first_ids.setdefault(key, ingredient_id)
+        if first_id != ingredient_id:
+            replacements[ingredient_id] = first_id
+    return replacements
+
+
+def merge_recipe_ingredients(replacements):
+    """
+    Функция переноса строк рецептов на оставляемые ингредиенты.
+    Если в рецепте есть и повтор, и оригинал, количества складываются
+    в одной строке. Возвращает идентификаторы измененных рецептов.
+    """
+    rows = RecipeIngredients.objects.filter(
+        recipe__in=RecipeIngredients.objects.filter(
+            ingredient_id__in=replacements
+        ).values('recipe_id'),
+        ingredient_id__in={*replacements, *replacements.values()}
+    ).order_by('id')
+
+    kept = {}
+    changed = {}
+    removed = []
+    for row in rows:
+        ingredient_id = replacements.get(row.ingredient_id, row.ingredient_id)
+        first = kept.setdefault((row.recipe_id, ingredient_id), row)
+        if first is not row:
+            first.amount += row.amount
+            removed.append(row.id)
+            changed[first.id] = first
+        elif row.ingredient_id != ingredient_id:
+            row.ingredient_id = ingredient_id
+            changed[row.id] = row
+
+    delete_rows(RecipeIngredients.objects.filter(id__in=removed))
+    RecipeIngredients.objects.bulk_update(
+        changed.values(), ['ingredient', 'amount']
+    )
+    return {recipe_id for recipe_id, _ in kept}
+
+
+class Command(BaseCommand):
+    help = (
+        'Объединение повторяющихся ингредиентов с переносом их '
+        'в рецептах. Запускается перед миграцией с ограничением '
+        'unique_ingredient_unit.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            replacements = get_replacements()
+            if not replacements:
+                self.stdout.write(self.style.SUCCESS(
+                    'Повторяющихся ингредиентов нет.'
+                ))
+                return
+
+            recipe_ids = merge_recipe_ingredients(replacements)
+            user_ids = set(Shopping.objects.filter(
+                recipe_id__in=recipe_ids
+            ).values_list('user_id', flat=True))
+
+            Ingredient.objects.filter(id__in=replacements).delete()
+            Recipe.objects.filter(id__in=recipe_ids).update(
+                updated_at=timezone.now()
+            )
+            sync_cart_items(user_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено повторяющихся ингредиентов {len(replacements)}, '
+            f'изменено рецептов {len(recipe_ids)}.'
+        ))
@@ -0,0 +1,29 @@
+from app.models import Favorite, Shopping
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Min
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаление повторяющихся записей избранного и списка покупок. '
+        'Запускается перед миграцией с уникальными ограничениями.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for model in (Favorite, Shopping):
+                first_ids = model.objects.values(
+                    'user', 'recipe'
+                ).annotate(
+                    first_id=Min('id')
+                ).values('first_id')
+
+                deleted, _ = model.objects.exclude(
+                    id__in=first_ids
+                ).delete()
+
+                self.stdout.write(self.style.SUCCESS(
+                    f'{model._meta.verbose_name_plural}: '
+                    f'удалено дубликатов {deleted}.'
+                ))
@@ -0,0 +1,175 @@
+import csv
+import json
+import re
+import time
+from io import StringIO
+from itertools import islice
+from pathlib import Path
+
+from app.models import Ingredient
+from app.versions import INGREDIENTS_VERSION, bump_version
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+READ_CHUNK_SIZE = 64 * 1024
+IMPORT_TABLE = 'ingredient_import'
+SEPARATOR = re.compile(r'[\s,]*')
+
+
+def read_csv(path):
+    """
+    Построчное чтение ингредиентов из CSV-файла.
+    """
+    with open(path, encoding='utf-8', newline='') as file:
+        for row in csv.reader(file):
+            if row:
+                yield row[0], row[1]
+
+
+def read_json(path):
+    """
+    Потоковое чтение ингредиентов из JSON-массива без загрузки
+    всего файла в память. Записи разбираются по смещению в буфере,
+    буфер копируется один раз на прочитанный блок файла.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+
+    with open(path, encoding='utf-8') as file:
+        for chunk in iter(lambda: file.read(READ_CHUNK_SIZE), ''):
+            buffer = buffer[position:] + chunk
+            position = 0
+
+            if not started:
+                position = SEPARATOR.match(buffer).end()
+                if position == len(buffer):
+                    continue
+                if buffer[position] != '[':
+                    raise CommandError('Ожидается JSON-массив ингредиентов.')
+                position += 1
+                started = True
+
+            while True:
+                position = SEPARATOR.match(buffer, position).end()
+                if position == len(buffer) or buffer[position] == ']':
+                    break
+                try:
+                    item, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    break
+                yield item['name'], item['measurement_unit']
+
+    if buffer[position:].strip() not in ('', ']'):
+        raise CommandError('Файл JSON обрывается на середине записи.')
+
+
+def normalize(rows):
+    """
+    Очистка пар (название, единица измерения) и пропуск пустых названий.
+    Повторы не отслеживаются: их отбрасывает уникальное ограничение
+    unique_ingredient_unit при вставке.
+    """
+    for name, measurement_unit in rows:
+        name = name.strip()
+        if name:
+            yield name, measurement_unit.strip()
+
+
+def batched(rows, batch_size):
+    """
+    Разбиение строк на пачки с пропуском повторов внутри пачки.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(dict.fromkeys(islice(rows, batch_size)))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_create_batch(batch):
+    Ingredient.objects.bulk_create(
+        [
+            Ingredient(name=name, measurement_unit=measurement_unit)
+            for name, measurement_unit in batch
+        ],
+        ignore_conflicts=True
+    )
+
+
+def copy_batch(batch):
+    """
+    Загрузка пачки через COPY во временную таблицу и перенос
+    в таблицу ингредиентов с пропуском существующих записей.
+    """
+    buffer = StringIO()
+    csv.writer(buffer).writerows(batch)
+    buffer.seek(0)
+
+    table = connection.ops.quote_name(Ingredient._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMP TABLE IF NOT EXISTS {IMPORT_TABLE} '
+            f'(name text, measurement_unit text) ON COMMIT DELETE ROWS'
+        )
+        cursor.copy_expert(
+            f'COPY {IMPORT_TABLE} (name, measurement_unit) '
+            f'FROM STDIN WITH (FORMAT csv)',
+            buffer
+        )
+        cursor.execute(
+            f'INSERT INTO {table} (name, measurement_unit) '
+            f'SELECT name, measurement_unit FROM {IMPORT_TABLE} '
+            f'ON CONFLICT DO NOTHING'
+        )
+
+
+class Command(BaseCommand):
+    help = 'Загрузка ингредиентов из CSV или JSON файла.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Не использовать COPY даже на PostgreSQL.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден.')
+
+        if path.suffix == '.json':
+            rows = read_json(path)
+        elif path.suffix == '.csv':
+            rows = read_csv(path)
+        else:
+            raise CommandError('Поддерживаются только файлы CSV и JSON.')
+
+        use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        load_batch = copy_batch if use_copy else bulk_create_batch
+
+        count_before = Ingredient.objects.count()
+        processed = 0
+        started = time.perf_counter()
+
+        for batch in batched(normalize(rows), options['batch_size']):
+            load_batch(batch)
+            processed += len(batch)
+
+        elapsed = time.perf_counter() - started
+        created = Ingredient.objects.count() - count_before
+        if created:
+            bump_version(INGREDIENTS_VERSION)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано {processed} строк, добавлено {created} '
+            f'ингредиентов за {elapsed:.2f} с '
+            f'({processed / max(elapsed, 1e-6):.0f} строк/с).'
+        ))
@@ -0,0 +1,56 @@
+from app.cart_items import (get_expected_cart_items, get_stored_cart_items,
+                            rebuild_cart_items)
+from django.core.management.base import BaseCommand
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверка и перестроение сводных списков покупок '
+        'по корзинам пользователей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только сообщить о расхождениях, ничего не изменяя.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        checked = 0
+        mismatched = 0
+
+        while True:
+            user_ids = list(
+                User.objects.filter(id__gt=last_id).order_by(
+                    'id'
+                ).values_list('id', flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+
+            expected = get_expected_cart_items(user_ids)
+            stored = get_stored_cart_items(user_ids)
+            broken = [
+                user_id for user_id in user_ids
+                if expected.get(user_id, {}) != stored.get(user_id, {})
+            ]
+            checked += len(user_ids)
+            mismatched += len(broken)
+
+            if broken and not options['check']:
+                rebuild_cart_items(
+                    broken,
+                    {user_id: expected[user_id] for user_id in broken}
+                )
+            last_id = user_ids[-1]
+
+        action = 'найдено' if options['check'] else 'исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено пользователей: {checked}, '
+            f'{action} расхождений: {mismatched}.'
+        ))
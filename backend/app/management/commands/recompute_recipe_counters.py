@@ -0,0 +1,38 @@
+from app.counters import recompute_counters
+from app.models import Recipe
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчет счетчиков избранного и списков покупок у рецептов '
+        'по таблицам Favorite и Shopping.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        updated = 0
+
+        while True:
+            ids = list(
+                Recipe.objects.filter(id__gt=last_id).order_by(
+                    'id'
+                ).values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                updated += recompute_counters(
+                    Recipe.objects.filter(id__in=ids)
+                )
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитаны счетчики у {updated} рецептов.'
+        ))
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from app.images import process_recipe_image
+from app.models import Recipe
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Повторное создание уменьшенных копий изображений рецептов '
+        'по сохраненному оригиналу: для рецептов, задача которых '
+        'потерялась при перезапуске, и для рецептов с ошибкой обработки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=10 * 60,
+            help=(
+                'Считать обработку зависшей, если рецепт в статусе '
+                'pending не менялся указанное число секунд.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        threshold = timezone.now() - timedelta(seconds=options['min_age'])
+        recipe_ids = list(
+            Recipe.objects.exclude(
+                Q(image='') | Q(image__isnull=True)
+            ).filter(
+                Q(image_status=Recipe.ImageStatus.failed)
+                | Q(
+                    image_status=Recipe.ImageStatus.pending,
+                    updated_at__lt=threshold
+                )
+            ).order_by('id').values_list('id', flat=True)
+        )
+
+        for recipe_id in recipe_ids:
+            process_recipe_image(recipe_id)
+
+        ready = Recipe.objects.filter(
+            id__in=recipe_ids,
+            image_status=Recipe.ImageStatus.ready
+        ).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {len(recipe_ids)}, '
+            f'готово: {ready}, с ошибкой: {len(recipe_ids) - ready}.'
+        ))
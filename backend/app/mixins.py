@@ -0,0 +1,75 @@
+from functools import partial
+from hashlib import sha1
+
+from app.versions import get_version
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date, quote_etag
+from django.utils.timezone import now
+from rest_framework.renderers import JSONRenderer
+
+RESPONSE_CACHE_KEY_TEMPLATE = 'response:{name}:{version}:{path}'
+
+
+class VersionedCacheMixin:
+    """
+    Кэширование JSON-ответов справочников на сервере с ETag
+    и Last-Modified. Версия справочника увеличивается сигналами
+    при его изменении, поэтому старые ответы больше не читаются.
+    """
+    cache_version_name = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, partial(super().list, request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, partial(super().retrieve, request, *args, **kwargs)
+        )
+
+    def get_cached_response(self, request, get_response):
+        if request.accepted_renderer.format != 'json':
+            return get_response()
+
+        version = get_version(self.cache_version_name)
+        path_digest = sha1(request.get_full_path().encode()).hexdigest()
+        key = RESPONSE_CACHE_KEY_TEMPLATE.format(
+            name=self.cache_version_name,
+            version=version,
+            path=path_digest,
+        )
+        cached = cache.get(key)
+
+        if cached is None:
+            response = get_response()
+            if response.status_code != 200:
+                return response
+
+            content = JSONRenderer().render(response.data)
+            cached = {
+                'etag': quote_etag(sha1(content).hexdigest()),
+                'last_modified': int(now().timestamp()),
+                'content': content,
+            }
+            cache.set(key, cached, settings.CATALOG_CACHE_TIMEOUT)
+
+        response = HttpResponse(
+            cached['content'],
+            content_type='application/json'
+        )
+        response['ETag'] = cached['etag']
+        response['Last-Modified'] = http_date(cached['last_modified'])
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ('Accept',))
+
+        return get_conditional_response(
+            request,
+            etag=cached['etag'],
+            last_modified=cached['last_modified'],
+            response=response,
+        )
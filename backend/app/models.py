@@ -1,9 +1,12 @@
+from app.storage import recipe_image_storage
 from app.validators import validate_hex
 from django.core import validators
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from users.models import User
 
+RECIPE_COUNTER_FIELDS = ('favorites_count', 'in_carts_count')
+
 
 class Ingredient(models.Model):
     class Units(models.TextChoices):
@@ -12,7 +15,7 @@ class Ingredient(models.Model):
 
     name = models.CharField(max_length=128)
     measurement_unit = models.CharField(
-        max_length=8,
+        max_length=64,
         default=Units.kilogram,
         choices=Units.choices
     )
@@ -23,6 +26,12 @@ class Ingredient(models.Model):
     class Meta:
         verbose_name = 'Ингридиент'
         verbose_name_plural = 'Ингридиенты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "measurement_unit"],
+                name="unique_ingredient_unit"
+            )
+        ]
 
 
 class RecipeIngredients(models.Model):
@@ -71,6 +80,11 @@ class Tag(models.Model):
 
 
 class Recipe(models.Model):
+    class ImageStatus(models.TextChoices):
+        pending = 'pending', _('Обрабатывается')
+        ready = 'ready', _('Готово')
+        failed = 'failed', _('Ошибка обработки')
+
     tags = models.ManyToManyField(Tag)
     name = models.CharField(max_length=128)
     author = models.ForeignKey(
@@ -80,10 +94,19 @@ class Recipe(models.Model):
     )
     image = models.ImageField(
         upload_to='recipe/images/',
+        storage=recipe_image_storage,
         null=True,
         default=None,
         blank=True
     )
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False)
+    image_status = models.CharField(
+        max_length=16,
+        choices=ImageStatus.choices,
+        default=ImageStatus.ready,
+        editable=False,
+        verbose_name="Обработка изображения"
+    )
     text = models.TextField()
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -116,15 +139,60 @@ class Recipe(models.Model):
             )
         ),
     )
+    updated_at = models.DateTimeField(auto_now=True)
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="В избранном"
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="В списках покупок"
+    )
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ("-id",)
+        indexes = [
+            models.Index(
+                fields=["-favorites_count", "-id"],
+                name="recipe_favorites_count_idx"
+            ),
+            models.Index(
+                fields=["-in_carts_count", "-id"],
+                name="recipe_in_carts_count_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        """
+        Счетчики меняются только выражениями F() и пересчетом,
+        поэтому при сохранении существующего рецепта они
+        не перезаписываются значениями, прочитанными раньше.
+        """
+        if (
+            update_fields is None
+            and not force_insert
+            and not self._state.adding
+        ):
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in RECIPE_COUNTER_FIELDS
+            ]
+        super().save(
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields
+        )
+
 
 class Favorite(models.Model):
     user = models.ForeignKey(
@@ -145,6 +213,11 @@ class Favorite(models.Model):
     class Meta:
         verbose_name = "Избранное"
         verbose_name_plural = "Избранные"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"], name="unique_favorite_recipe"
+            )
+        ]
 
 
 class Shopping(models.Model):
@@ -163,6 +236,52 @@ class Shopping(models.Model):
     class Meta:
         verbose_name = "Корзина"
         verbose_name_plural = "Корзины"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"], name="unique_shopping_recipe"
+            )
+        ]
 
     def __str__(self):
         return f'Рецепт {self.recipe} в списке покупок у {self.user}'
+
+
+class ShoppingCartItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_cart_items'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_cart_items'
+    )
+    total_amount = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Ингредиент в списке покупок"
+        verbose_name_plural = "Ингредиенты в списках покупок"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "ingredient"], name="unique_cart_ingredient"
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f'{self.ingredient} в количестве {self.total_amount} '
+            f'в списке покупок у {self.user}'
+        )
+
+
+class DataVersion(models.Model):
+    name = models.CharField(max_length=32, primary_key=True)
+    version = models.PositiveBigIntegerField(default=1)
+
+    class Meta:
+        verbose_name = "Версия справочника"
+        verbose_name_plural = "Версии справочников"
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
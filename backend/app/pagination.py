@@ -1,6 +1,110 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+COUNT_CACHE_KEY_TEMPLATE = 'count:{digest}'
+
+
+def estimate_count(queryset):
+    """
+    Функция оценки количества строк по плану запроса PostgreSQL.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def cached_count(queryset):
+    """
+    Функция подсчета строк с кэшированием по тексту запроса.
+    """
+    sql, params = queryset.query.sql_with_params()
+    digest = sha1(f'{sql}:{params}'.encode()).hexdigest()
+    return cache.get_or_set(
+        COUNT_CACHE_KEY_TEMPLATE.format(digest=digest),
+        queryset.count,
+        settings.PAGINATION_COUNT_CACHE_TIMEOUT
+    )
+
+
+class CountStrategyPaginator(Paginator):
+    """
+    Пагинатор с выбором способа подсчета общего количества:
+    exact - точный COUNT(*), cached - COUNT(*) с коротким кэшем,
+    estimate - оценка планировщика PostgreSQL для больших выборок
+    и точный COUNT(*) для небольших.
+    """
+    @cached_property
+    def count(self):
+        strategy = settings.PAGINATION_COUNT_STRATEGY
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+
+        queryset = self.object_list.values('pk')
+        try:
+            if strategy == 'cached':
+                return cached_count(queryset)
+
+            if (
+                strategy == 'estimate'
+                and connections[queryset.db].vendor == 'postgresql'
+            ):
+                estimate = estimate_count(queryset)
+                threshold = settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD
+                if estimate >= threshold:
+                    return estimate
+        except EmptyResultSet:
+            return 0
+
+        return super().count
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class FeedCursorPagination(CursorPagination):
+    page_size = 6
+    page_size_query_param = 'limit'
+    ordering = '-id'
+
+
+class FeedPagination(CustomPagination):
+    """
+    Постраничная выдача лент с режимом курсора.
+    Параметр cursor (в том числе пустой) включает выдачу по ключу
+    без подсчета общего количества и без OFFSET. В обычном режиме
+    общее количество считается по PAGINATION_COUNT_STRATEGY.
+    """
+    cursor_pagination_class = FeedCursorPagination
+    django_paginator_class = CountStrategyPaginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+
+        if cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,68 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+def mark_error_as_json(renderer_context):
+    """
+    Функция замены типа содержимого ответа с ошибкой на JSON:
+    заголовок выставляется по выбранному формату выгрузки до отрисовки.
+    """
+    response = (renderer_context or {}).get('response')
+    if response is not None and response.status_code >= 400:
+        response['Content-Type'] = JSONRenderer.media_type
+
+
+class ExportRenderer(JSONRenderer):
+    """
+    Выбор формата выгрузки. Сообщения об ошибках отдаются в JSON.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        mark_error_as_json(renderer_context)
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class PdfRenderer(ExportRenderer):
+    """
+    Выбор PDF-выгрузки. Сообщения об ошибках отдаются в JSON.
+    """
+    media_type = 'application/pdf'
+    format = 'pdf'
+
+
+class CsvRenderer(ExportRenderer):
+    """
+    Выбор CSV-выгрузки. Сообщения об ошибках отдаются в JSON.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class TxtRenderer(ExportRenderer):
+    """
+    Выбор текстовой выгрузки. Сообщения об ошибках отдаются в JSON.
+    """
+    media_type = 'text/plain'
+    format = 'txt'
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Согласование любого типа для ответов с файлом.
+    Сообщения об ошибках отдаются в JSON.
+    """
+    media_type = '*/*'
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        mark_error_as_json(renderer_context)
+        return JSONRenderer().render(data)
+
+
+SHOPPING_LIST_RENDERERS = (
+    PdfRenderer,
+    JSONRenderer,
+    CsvRenderer,
+    TxtRenderer,
+)
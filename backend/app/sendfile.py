@@ -0,0 +1,73 @@
+import mimetypes
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+
+
+def get_internal_url(path):
+    """
+    Функция получения внутреннего адреса nginx для файла
+    по таблице SENDFILE_LOCATIONS.
+    """
+    for root, url in settings.SENDFILE_LOCATIONS.items():
+        root = Path(root).resolve()
+        if root in path.parents:
+            return url + quote(path.relative_to(root).as_posix())
+    raise ValueError(f'Файл {path} вне каталогов SENDFILE_LOCATIONS.')
+
+
+def get_content_disposition(filename, as_attachment):
+    """
+    Функция заголовка Content-Disposition с именем файла,
+    не входящим в ASCII, в форме RFC 5987.
+    """
+    disposition = 'attachment' if as_attachment else 'inline'
+    if filename is None:
+        return disposition
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        return f"{disposition}; filename*=utf-8''{quote(filename)}"
+    return f'{disposition}; filename="{filename}"'
+
+
+def sendfile_response(path, filename=None, content_type=None,
+                      as_attachment=False):
+    """
+    Функция ответа с файлом с диска. Права проверяет Django,
+    а байты отдает прокси: nginx по X-Accel-Redirect или
+    Apache/lighttpd по X-Sendfile. Без прокси файл отдается
+    через FileResponse.
+    """
+    path = Path(path).resolve()
+    if not path.is_file():
+        raise Http404('Файл не найден.')
+
+    if content_type is None:
+        content_type = mimetypes.guess_type(path.name)[0]
+    content_type = content_type or 'application/octet-stream'
+    backend = settings.SENDFILE_BACKEND
+
+    if backend == 'django':
+        return FileResponse(
+            path.open('rb'),
+            as_attachment=as_attachment,
+            filename=filename or '',
+            content_type=content_type
+        )
+
+    response = HttpResponse(content_type=content_type)
+    if backend == 'nginx':
+        response['X-Accel-Redirect'] = get_internal_url(path)
+    elif backend == 'sendfile':
+        response['X-Sendfile'] = str(path)
+    else:
+        raise ValueError(f'Неизвестный SENDFILE_BACKEND: {backend}.')
+
+    if as_attachment or filename:
+        response['Content-Disposition'] = get_content_disposition(
+            filename or path.name, as_attachment
+        )
+    return response
@@ -1,6 +1,13 @@
+from collections import Counter
+
+from app.bulk import delete_rows
+from app.cart_items import change_recipe_in_carts
+from app.fields import StreamingBase64ImageField, ThumbnailsField
+from app.images import save_recipe_image, schedule_recipe_image
 from app.models import (Favorite, Ingredient, Recipe, RecipeIngredients,
                         Shopping, Tag)
-from drf_base64.fields import Base64ImageField
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from users.serializers import CustomUserSerializer
 
@@ -36,25 +43,77 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
 
 
 class RecipeFavoriteSerializer(serializers.ModelSerializer):
+    thumbnails = ThumbnailsField()
+
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = (
+            'id', 'name', 'image', 'thumbnails', 'image_status',
+            'cooking_time'
+        )
+
+
+class PrimaryKeyListField(serializers.ListField):
+    """
+    Список первичных ключей, который проверяется одним запросом
+    вместо отдельного запроса на каждый ключ.
+    """
+    child = serializers.IntegerField(min_value=1)
+
+    def __init__(self, queryset, **kwargs):
+        self.queryset = queryset
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        ids = list(dict.fromkeys(super().to_internal_value(data)))
+        objects = self.queryset.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in objects]
+        if missing:
+            raise serializers.ValidationError(
+                f'Недопустимые первичные ключи {missing} - '
+                f'объекты не существуют.'
+            )
+        return [objects[pk] for pk in ids]
+
+
+class RecipeIngredientListSerializer(serializers.ListSerializer):
+    """
+    Проверка ингредиентов рецепта: повторы ищутся в памяти,
+    существование ингредиентов - одним запросом.
+    """
+    def validate(self, attrs):
+        ids = [item['ingredient']['id'] for item in attrs]
+        duplicates = sorted(
+            pk for pk, times in Counter(ids).items() if times > 1
+        )
+        if duplicates:
+            raise serializers.ValidationError(
+                f'Ингредиенты {duplicates} указаны несколько раз.'
+            )
+
+        ingredients = Ingredient.objects.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in ingredients]
+        if missing:
+            raise serializers.ValidationError(
+                f'Ингредиенты {missing} не существуют.'
+            )
+
+        for item in attrs:
+            item['ingredient']['id'] = ingredients[item['ingredient']['id']]
+        return attrs
 
 
 class RecipeIngredientCreateSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        source='ingredient.id',
-        queryset=Ingredient.objects.all(),
-    )
+    id = serializers.IntegerField(source='ingredient.id', min_value=1)
 
     class Meta:
         model = RecipeIngredients
         fields = ('id', 'amount')
+        list_serializer_class = RecipeIngredientListSerializer
 
 
 class RecipeSerializer(serializers.ModelSerializer):
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True,
+    tags = PrimaryKeyListField(
         queryset=Tag.objects.all(),
         write_only=True
     )
@@ -66,13 +125,29 @@ class RecipeSerializer(serializers.ModelSerializer):
     author = CustomUserSerializer()
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
-    image = Base64ImageField()
+    image = StreamingBase64ImageField()
+    thumbnails = ThumbnailsField()
 
     class Meta:
         model = Recipe
-        fields = '__all__'
+        fields = (
+            'id',
+            'tags',
+            'author',
+            'ingredients',
+            'is_favorited',
+            'is_in_shopping_cart',
+            'name',
+            'image',
+            'thumbnails',
+            'image_status',
+            'text',
+            'cooking_time',
+        )
 
     def get_is_favorited(self, instance):
+        if hasattr(instance, 'favorited'):
+            return instance.favorited
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return instance.is_favorited.filter(
@@ -81,6 +156,8 @@ class RecipeSerializer(serializers.ModelSerializer):
         return False
 
     def get_is_in_shopping_cart(self, instance):
+        if hasattr(instance, 'in_shopping_cart'):
+            return instance.in_shopping_cart
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return instance.is_in_shopping_cart.filter(
@@ -88,31 +165,91 @@ class RecipeSerializer(serializers.ModelSerializer):
             ).exists()
         return False
 
+    def update_ingredients(self, instance, ingredients_data):
+        """
+        Функция обновления ингредиентов рецепта по разнице
+        с текущими строками: изменяются только отличающиеся
+        количества, добавляются новые и удаляются лишние строки.
+        """
+        existing = {
+            row.ingredient_id: row
+            for row in instance.recipe_ingredients.all()
+        }
+        amounts = {
+            ingredient_data['ingredient']['id'].id: ingredient_data['amount']
+            for ingredient_data in ingredients_data
+        }
+
+        changed = []
+        created = []
+        deltas = {}
+        for ingredient_id, amount in amounts.items():
+            row = existing.get(ingredient_id)
+            if row is None:
+                created.append(RecipeIngredients(
+                    recipe=instance,
+                    ingredient_id=ingredient_id,
+                    amount=amount
+                ))
+                deltas[ingredient_id] = amount
+            elif row.amount != amount:
+                deltas[ingredient_id] = amount - row.amount
+                row.amount = amount
+                changed.append(row)
+
+        removed = []
+        for ingredient_id, row in existing.items():
+            if ingredient_id not in amounts:
+                removed.append(row.id)
+                deltas[ingredient_id] = -row.amount
+
+        if removed:
+            # Без сигналов по каждой строке: списки покупок изменяются
+            # по deltas, а отметку изменения рецепта обновляет save().
+            delete_rows(RecipeIngredients.objects.filter(id__in=removed))
+        if changed:
+            RecipeIngredients.objects.bulk_update(changed, ['amount'])
+        if created:
+            RecipeIngredients.objects.bulk_create(created)
+        change_recipe_in_carts(instance.id, deltas)
+
+    @transaction.atomic
     def update(self, instance, validated_data):
         if 'tags' in validated_data:
             tags_data = validated_data.pop('tags')
             instance.tags.set(tags_data)
 
         if 'recipe_ingredients' in validated_data:
-            ingredients_data = validated_data.pop('recipe_ingredients')
-            RecipeIngredients.objects.filter(recipe=instance).delete()
-
-            ingredient_objs = [
-                RecipeIngredients(
-                    recipe=instance,
-                    ingredient_id=ingredient_data['ingredient']['id'].id,
-                    amount=ingredient_data['amount']
-                )
-                for ingredient_data in ingredients_data
-            ]
-
-            RecipeIngredients.objects.bulk_create(ingredient_objs)
+            self.update_ingredients(
+                instance,
+                validated_data.pop('recipe_ingredients')
+            )
 
-        return super().update(instance, validated_data)
+        if 'image' in validated_data:
+            validated_data['image'] = save_recipe_image(
+                validated_data['image']
+            )
+            validated_data['thumbnails'] = {}
+            validated_data['image_status'] = Recipe.ImageStatus.pending
+            schedule_recipe_image(instance.id)
+
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # Изображение и миниатюры записывает обработчик изображений,
+        # поэтому сохраняются только поля из запроса: полное сохранение
+        # могло бы вернуть прежние значения поверх его результата.
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
 
     def to_representation(self, instance):
+        if hasattr(instance, 'author_subscribed'):
+            instance.author.subscribed = instance.author_subscribed
+
         representation = super().to_representation(instance)
 
+        # После изменения рецепта DRF сбрасывает кэш prefetch_related;
+        # уже загруженные списком рецептов строки повторно не читаются.
+        prefetch_related_objects([instance], 'recipe_ingredients__ingredient')
         representation['ingredients'] = RecipeIngredientSerializer(
             instance.recipe_ingredients.all(), many=True
         ).data
@@ -125,13 +262,13 @@ class RecipeSerializer(serializers.ModelSerializer):
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
     id = serializers.ReadOnlyField()
-    image = Base64ImageField()
+    image = StreamingBase64ImageField()
+    thumbnails = ThumbnailsField()
     ingredients = RecipeIngredientCreateSerializer(
         many=True,
         write_only=True
     )
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True,
+    tags = PrimaryKeyListField(
         queryset=Tag.objects.all(),
         write_only=True
     )
@@ -144,13 +281,21 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             'name', 'tags',
             'ingredients',
             'cooking_time',
-            'text', 'image'
+            'text', 'image', 'thumbnails',
+            'image_status'
         )
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients')
         tags_data = validated_data.pop('tags')
-        recipe = Recipe.objects.create(**validated_data)
+        image_name = save_recipe_image(validated_data.pop('image'))
+        recipe = Recipe.objects.create(
+            **validated_data,
+            image=image_name,
+            image_status=Recipe.ImageStatus.pending
+        )
+        schedule_recipe_image(recipe.id)
 
         ingredient_objs = [
             RecipeIngredients(
@@ -161,7 +306,9 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             for ingredient_data in ingredients_data
         ]
 
-        recipe.tags.set(tags_data)
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe=recipe, tag=tag) for tag in tags_data
+        ])
 
         RecipeIngredients.objects.bulk_create(ingredient_objs)
 
@@ -171,7 +318,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         representation = super().to_representation(instance)
 
         representation['ingredients'] = RecipeIngredientSerializer(
-            instance.recipe_ingredients.all(),
+            instance.recipe_ingredients.select_related('ingredient'),
             many=True
         ).data
 
@@ -184,6 +331,17 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         return representation
 
 
+class BatchIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=1000
+    )
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
+
+
 class ShoppingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Shopping
@@ -0,0 +1,103 @@
+import os
+import shutil
+from hashlib import sha1
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+from app.models import Shopping
+from django.conf import settings
+
+SHOPPING_LISTS_DIR = 'shopping_lists'
+TEMP_DIR = '.tmp'
+REPLACE_ATTEMPTS = 3
+
+
+def get_cart_etag(user):
+    """
+    Функция вычисления ETag списка покупок по состоянию корзины.
+    Возвращает None, если корзина пуста.
+    """
+    cart_state = list(Shopping.objects.filter(
+        user=user
+    ).order_by(
+        'recipe_id'
+    ).values_list(
+        'recipe_id',
+        'recipe__updated_at',
+    ))
+
+    if not cart_state:
+        return None
+
+    digest = sha1()
+    for recipe_id, updated_at in cart_state:
+        digest.update(f'{recipe_id}:{updated_at.isoformat()};'.encode())
+    return digest.hexdigest()
+
+
+def get_user_dir(user_id):
+    return Path(settings.PROTECTED_MEDIA_ROOT) / SHOPPING_LISTS_DIR / str(
+        user_id
+    )
+
+
+def get_temp_dir():
+    return Path(settings.PROTECTED_MEDIA_ROOT) / SHOPPING_LISTS_DIR / TEMP_DIR
+
+
+def get_cached_shopping_list(user, etag, extension):
+    """
+    Функция получения пути к готовому файлу списка покупок.
+    Возвращает None, если файл для этого ETag еще не создан.
+    """
+    path = get_user_dir(user.id) / f'{etag}.{extension}'
+    if path.is_file():
+        return path
+    return None
+
+
+def cache_shopping_list(user, etag, extension, chunks):
+    """
+    Функция сохранения готового файла списка покупок на диск.
+    Файл записывается во временный вне каталога пользователя
+    и переименовывается, прежние файлы пользователя удаляются.
+    Каталог пользователя может удалить invalidate_shopping_list
+    в любой момент, тогда он создается заново.
+    """
+    temp_dir = get_temp_dir()
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    user_dir = get_user_dir(user.id)
+    path = user_dir / f'{etag}.{extension}'
+
+    with NamedTemporaryFile(dir=temp_dir, delete=False) as file:
+        try:
+            for chunk in chunks:
+                file.write(chunk)
+        except BaseException:
+            Path(file.name).unlink(missing_ok=True)
+            raise
+
+    for attempt in range(REPLACE_ATTEMPTS):
+        user_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(file.name, path)
+            break
+        except FileNotFoundError:
+            if attempt == REPLACE_ATTEMPTS - 1:
+                Path(file.name).unlink(missing_ok=True)
+                raise
+
+    try:
+        for old_path in user_dir.iterdir():
+            if old_path != path and old_path.suffix == path.suffix:
+                old_path.unlink(missing_ok=True)
+    except FileNotFoundError:
+        pass
+    return path
+
+
+def invalidate_shopping_list(user_id):
+    """
+    Функция удаления готовых файлов списка покупок пользователя.
+    """
+    shutil.rmtree(get_user_dir(user_id), ignore_errors=True)
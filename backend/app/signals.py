@@ -0,0 +1,176 @@
+from collections import Counter
+
+from app.autocomplete import ingredient_autocomplete
+from app.cart_items import (change_cart_items, change_recipe_in_carts,
+                            get_recipe_amounts)
+from app.counters import change_counters
+from app.models import (Favorite, Ingredient, Recipe, RecipeIngredients,
+                        Shopping, Tag)
+from app.shopping_list_cache import invalidate_shopping_list
+from app.versions import INGREDIENTS_VERSION, TAGS_VERSION, bump_version
+from django.db import connections
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+INGREDIENT_TABLE = Ingredient._meta.db_table
+INGREDIENT_SEARCH_SQL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f'CREATE INDEX IF NOT EXISTS ingredient_name_prefix_idx '
+    f'ON {INGREDIENT_TABLE} (UPPER(name) text_pattern_ops)',
+    f'CREATE INDEX IF NOT EXISTS ingredient_name_trgm_idx '
+    f'ON {INGREDIENT_TABLE} USING gin (UPPER(name) gin_trgm_ops)',
+)
+
+
+@receiver((post_save, post_delete), sender=Shopping)
+def shopping_changed(sender, instance, **kwargs):
+    """
+    Сброс кэша списка покупок при изменении корзины.
+    """
+    invalidate_shopping_list(instance.user_id)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=Shopping)
+def mark_created(sender, instance, created, **kwargs):
+    """
+    Увеличение счетчика рецепта при добавлении в избранное
+    или в список покупок.
+    """
+    if created:
+        change_counters(sender, [instance.recipe_id])
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=Shopping)
+def mark_deleted(sender, instance, **kwargs):
+    """
+    Уменьшение счетчика рецепта при удалении из избранного
+    или из списка покупок, в том числе каскадном.
+    """
+    change_counters(sender, [instance.recipe_id], -1)
+
+
+@receiver(post_save, sender=Shopping)
+def shopping_created(sender, instance, created, **kwargs):
+    """
+    Добавление ингредиентов рецепта в сводный список покупок.
+    """
+    if created:
+        change_cart_items(
+            [instance.user_id],
+            get_recipe_amounts([instance.recipe_id])
+        )
+
+
+@receiver(post_delete, sender=Shopping)
+def shopping_deleted(sender, instance, **kwargs):
+    """
+    Вычитание ингредиентов рецепта из сводного списка покупок.
+    При каскадном удалении рецепта ингредиенты, удаленные раньше
+    корзины, уже вычтены обработчиком recipe_ingredient_deleted.
+    """
+    amounts = get_recipe_amounts([instance.recipe_id])
+    change_cart_items(
+        [instance.user_id],
+        {ingredient_id: -amount for ingredient_id, amount in amounts.items()}
+    )
+
+
+@receiver(pre_save, sender=RecipeIngredients)
+def recipe_ingredient_saving(sender, instance, **kwargs):
+    """
+    Запоминание прежнего ингредиента и количества
+    для расчета изменения списков покупок.
+    """
+    instance._previous_amount = None
+    if instance.pk is not None:
+        instance._previous_amount = RecipeIngredients.objects.filter(
+            pk=instance.pk
+        ).values_list('ingredient_id', 'amount').first()
+
+
+@receiver(post_save, sender=RecipeIngredients)
+def recipe_ingredient_saved(sender, instance, **kwargs):
+    """
+    Изменение списков покупок, в которых есть рецепт.
+    """
+    deltas = Counter({instance.ingredient_id: instance.amount})
+    previous = getattr(instance, '_previous_amount', None)
+    if previous is not None:
+        ingredient_id, amount = previous
+        deltas[ingredient_id] -= amount
+    change_recipe_in_carts(instance.recipe_id, deltas)
+
+
+@receiver(post_delete, sender=RecipeIngredients)
+def recipe_ingredient_deleted(sender, instance, **kwargs):
+    """
+    Вычитание ингредиента из списков покупок, в которых есть рецепт.
+    """
+    change_recipe_in_carts(
+        instance.recipe_id,
+        {instance.ingredient_id: -instance.amount}
+    )
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredients)
+def recipe_ingredients_changed(sender, instance, **kwargs):
+    """
+    Обновление отметки изменения рецепта при изменении ингредиентов.
+    """
+    Recipe.objects.filter(
+        pk=instance.recipe_id
+    ).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_edited(sender, instance, created, **kwargs):
+    """
+    Обновление отметки изменения рецептов с ингредиентом
+    при изменении его названия или единицы измерения:
+    от нее зависит ETag готового списка покупок.
+    """
+    if not created:
+        Recipe.objects.filter(
+            recipe_ingredients__ingredient=instance
+        ).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def ingredient_changed(sender, instance, **kwargs):
+    """
+    Сброс индекса автодополнения и кэша ответов
+    при изменении справочника.
+    """
+    bump_version(INGREDIENTS_VERSION)
+    ingredient_autocomplete.invalidate()
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    """
+    Сброс кэша ответов со списком тегов.
+    """
+    bump_version(TAGS_VERSION)
+
+
+@receiver(post_migrate)
+def create_ingredient_search_indexes(sender, using, **kwargs):
+    """
+    Создание индексов поиска ингредиентов по началу названия
+    и по триграммам. Индексы нужны только на PostgreSQL.
+    """
+    connection = connections[using]
+    if sender.label != 'app' or connection.vendor != 'postgresql':
+        return
+
+    with connection.cursor() as cursor:
+        for statement in INGREDIENT_SEARCH_SQL:
+            cursor.execute(statement)
@@ -0,0 +1,41 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, в котором имя файла - SHA-256 его содержимого.
+    Повторная загрузка того же файла не создает копию,
+    а возвращает имя уже сохраненного.
+    """
+    def get_content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+
+        directory = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], f'{digest}{extension}')
+
+    def touch(self, name):
+        """
+        Обновление времени изменения файла: collect_recipe_images
+        не удаляет файлы моложе --min-age, поэтому повторно
+        используемый файл не пропадет, пока на него не сошлется рецепт.
+        """
+        os.utime(self.path(name))
+
+    def _save(self, name, content):
+        name = self.get_content_name(name, content)
+        try:
+            self.touch(name)
+        except FileNotFoundError:
+            return super()._save(name, content)
+        return name
+
+
+recipe_image_storage = ContentAddressedStorage()
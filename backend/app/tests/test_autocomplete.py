@@ -0,0 +1,81 @@
+import pytest
+from app.autocomplete import get_trigrams, ingredient_autocomplete
+from app.models import Ingredient
+from app.versions import INGREDIENTS_VERSION, bump_version
+from django.core.cache import cache
+from django.db import connection
+
+INGREDIENTS_URL = '/api/ingredients/'
+NAMES = (
+    'сахарная пудра',
+    'сахар',
+    'ванильный сахар',
+    'сахар коричневый',
+    'соль',
+    'тростниковый сахар',
+    'сахарин',
+)
+
+
+@pytest.fixture
+def catalog():
+    cache.clear()
+    ingredient_autocomplete.invalidate()
+    for name in NAMES:
+        Ingredient.objects.create(name=name, measurement_unit='г')
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='Сходство в запросе к базе считает только pg_trgm.'
+)
+@pytest.mark.parametrize('query', ('сахар', 'сах', 'ар'))
+def test_in_memory_and_orm_order_match(client, settings, catalog, query):
+    settings.INGREDIENT_AUTOCOMPLETE_IN_MEMORY = False
+    from_orm = client.get(INGREDIENTS_URL, {'name': query}).json()
+    cache.clear()
+    settings.INGREDIENT_AUTOCOMPLETE_IN_MEMORY = True
+    from_memory = client.get(INGREDIENTS_URL, {'name': query}).json()
+
+    assert from_orm
+    assert from_memory == from_orm
+
+
+@pytest.mark.django_db
+def test_prefix_matches_go_first_most_similar_first(
+    settings, client, catalog
+):
+    settings.INGREDIENT_AUTOCOMPLETE_IN_MEMORY = True
+    response = client.get(INGREDIENTS_URL, {'name': 'сахар'})
+
+    assert [row['name'] for row in response.json()] == [
+        'сахар',
+        'сахарин',
+        'сахар коричневый',
+        'сахарная пудра',
+        'ванильный сахар',
+        'тростниковый сахар',
+    ]
+
+
+def test_trigrams_match_pg_trgm():
+    # Значения show_trgm() из документации pg_trgm.
+    assert get_trigrams('word') == {'  w', ' wo', 'wor', 'ord', 'rd '}
+    assert get_trigrams('Two, words!') == {
+        '  t', ' tw', 'two', 'wo ', '  w', ' wo', 'wor', 'ord', 'rds', 'ds '
+    }
+
+
+@pytest.mark.django_db
+def test_index_is_rebuilt_after_version_bump(catalog):
+    assert not ingredient_autocomplete.search('мед')
+    # Загрузка из другого процесса: сигналы этого процесса не срабатывают.
+    Ingredient.objects.bulk_create([
+        Ingredient(name='мед', measurement_unit='г')
+    ])
+    bump_version(INGREDIENTS_VERSION)
+
+    assert [row['name'] for row in ingredient_autocomplete.search('мед')] == [
+        'мед'
+    ]
@@ -0,0 +1,96 @@
+import pytest
+from app.cart_items import get_expected_cart_items, get_stored_cart_items
+from app.models import Favorite, Recipe, Shopping
+
+BATCH_URLS = {
+    Favorite: '/api/recipes/favorite/',
+    Shopping: '/api/recipes/shopping_cart/',
+}
+COUNTER_FIELDS = {
+    Favorite: 'favorites_count',
+    Shopping: 'in_carts_count',
+}
+# SAVEPOINT, удаление, пересчет счетчиков, RELEASE SAVEPOINT; для списка
+# покупок еще чтение ожидаемого и сохраненного сводного списка, SAVEPOINT,
+# изменение и удаление его строк, RELEASE SAVEPOINT.
+BATCH_DELETE_QUERIES = {
+    Favorite: 4,
+    Shopping: 10,
+}
+
+
+@pytest.fixture
+def concurrent_mark(monkeypatch, user):
+    """
+    Параллельный запрос успевает отметить рецепт между чтением
+    уже отмеченных рецептов и пакетной вставкой.
+    """
+    def concurrent_mark(model, recipe):
+        bulk_create = model.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            model.objects.create(user=user, recipe=recipe)
+            return bulk_create(objs, **kwargs)
+
+        monkeypatch.setattr(model.objects, 'bulk_create', racing_bulk_create)
+    return concurrent_mark
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('model', (Favorite, Shopping))
+def test_batch_counters_do_not_drift_on_conflicts(
+    user, user_client, recipes, concurrent_mark, model
+):
+    ids = [recipe.id for recipe in recipes[:3]]
+    concurrent_mark(model, recipes[0])
+
+    response = user_client.post(BATCH_URLS[model], {'ids': ids})
+
+    assert response.status_code == 201
+    assert list(
+        Recipe.objects.filter(id__in=ids).values_list(
+            COUNTER_FIELDS[model], flat=True
+        )
+    ) == [1, 1, 1]
+    assert model.objects.filter(user=user).count() == 3
+
+
+@pytest.mark.django_db
+def test_batch_cart_items_match_cart_on_conflicts(
+    user, user_client, recipes, concurrent_mark
+):
+    concurrent_mark(Shopping, recipes[0])
+
+    user_client.post(
+        BATCH_URLS[Shopping],
+        {'ids': [recipe.id for recipe in recipes[:3]]}
+    )
+
+    assert get_stored_cart_items([user.id]) == get_expected_cart_items(
+        [user.id]
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('model', (Favorite, Shopping))
+@pytest.mark.parametrize('count', (3, 20))
+def test_batch_delete_query_count_does_not_depend_on_ids(
+    user, user_client, recipes, django_assert_num_queries, model, count
+):
+    ids = [recipe.id for recipe in recipes[:count]]
+    user_client.post(BATCH_URLS[model], {'ids': ids})
+
+    with django_assert_num_queries(BATCH_DELETE_QUERIES[model]):
+        response = user_client.delete(BATCH_URLS[model], {'ids': ids})
+
+    assert response.status_code == 200
+    assert response.json() == {'deleted': count}
+    assert not model.objects.filter(user=user).exists()
+    assert set(
+        Recipe.objects.filter(id__in=ids).values_list(
+            COUNTER_FIELDS[model], flat=True
+        )
+    ) == {0}
+    assert get_stored_cart_items([user.id]) == get_expected_cart_items(
+        [user.id]
+    )
@@ -0,0 +1,31 @@
+from io import StringIO
+
+import pytest
+from app.versions import INGREDIENTS_VERSION, bump_version, get_version
+from django.core.cache import cache
+from django.core.management import call_command
+
+INGREDIENTS_URL = '/api/ingredients/'
+
+
+@pytest.mark.django_db
+def test_version_is_shared_between_processes():
+    bump_version(INGREDIENTS_VERSION)
+    version = get_version(INGREDIENTS_VERSION)
+    # Локальный кэш другого процесса ничего не знает о повышении версии.
+    cache.clear()
+
+    assert version > 1
+    assert get_version(INGREDIENTS_VERSION) == version
+
+
+@pytest.mark.django_db
+def test_load_ingredients_refreshes_cached_list(client, ingredients, tmp_path):
+    cache.clear()
+    count = len(client.get(INGREDIENTS_URL).json())
+    source = tmp_path / 'ingredients.csv'
+    source.write_text('новый ингредиент,г\n', encoding='utf-8')
+
+    call_command('load_ingredients', str(source), stdout=StringIO())
+
+    assert len(client.get(INGREDIENTS_URL).json()) == count + 1
@@ -0,0 +1,74 @@
+import base64
+import textwrap
+from io import BytesIO
+
+import pytest
+from app.fields import StreamingBase64ImageField
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+
+def encode_image(image_format='PNG', size=(300, 200)):
+    buffer = BytesIO()
+    Image.effect_noise(size, 50).convert('RGB').save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def to_data_uri(content, image_format='png'):
+    return (
+        f'data:image/{image_format};base64,'
+        f'{base64.b64encode(content).decode()}'
+    )
+
+
+@pytest.mark.parametrize('image_format', ('PNG', 'JPEG', 'WEBP', 'GIF'))
+def test_truncated_image_is_rejected(image_format):
+    content = encode_image(image_format)
+
+    with pytest.raises(ValidationError):
+        StreamingBase64ImageField().to_internal_value(
+            to_data_uri(content[:len(content) // 2], image_format.lower())
+        )
+
+
+@pytest.mark.parametrize('image_format', ('WEBP', 'GIF'))
+def test_webp_and_gif_are_not_decoded(monkeypatch, image_format):
+    content = encode_image(image_format)
+
+    def load(image):
+        raise AssertionError('Изображение распаковано в запросе.')
+
+    monkeypatch.setattr(Image.Image, 'load', load)
+
+    image_file = StreamingBase64ImageField().to_internal_value(
+        to_data_uri(content, image_format.lower())
+    )
+
+    assert image_file.read() == content
+
+
+def test_wrapped_base64_is_accepted():
+    content = encode_image()
+    header, encoded = to_data_uri(content).split(',', 1)
+    wrapped = f'{header},' + '\r\n'.join(textwrap.wrap(encoded, 76))
+
+    image_file = StreamingBase64ImageField().to_internal_value(wrapped)
+
+    assert image_file.name == 'image.png'
+    assert image_file.read() == content
+
+
+def test_incomplete_base64_is_rejected():
+    with pytest.raises(ValidationError):
+        StreamingBase64ImageField().to_internal_value(
+            to_data_uri(encode_image())[:-1]
+        )
+
+
+def test_too_many_pixels_are_rejected(settings):
+    settings.RECIPE_IMAGE_MAX_PIXELS = 100 * 100
+
+    with pytest.raises(ValidationError):
+        StreamingBase64ImageField().to_internal_value(
+            to_data_uri(encode_image(size=(200, 200)))
+        )
@@ -0,0 +1,33 @@
+import pytest
+from app.models import Recipe
+
+RECIPES_URL = '/api/recipes/'
+# Проверка тегов и ингредиентов, SAVEPOINT, рецепт, теги,
+# ингредиенты рецепта, RELEASE SAVEPOINT, подписки, ингредиенты
+# и теги для ответа.
+RECIPE_CREATE_QUERIES = 10
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('ingredient_count', (1, 30))
+def test_recipe_create_query_count_does_not_depend_on_ingredients(
+    user_client, recipe_data, django_assert_num_queries, ingredient_count
+):
+    data = recipe_data(ingredient_count)
+
+    with django_assert_num_queries(RECIPE_CREATE_QUERIES):
+        response = user_client.post(RECIPES_URL, data, format='json')
+
+    assert response.status_code == 201
+    assert len(response.json()['ingredients']) == ingredient_count
+
+
+@pytest.mark.django_db
+def test_recipe_create_rejects_unknown_ingredient(user_client, recipe_data):
+    data = recipe_data(30)
+    data['ingredients'][-1]['id'] = 10 ** 6
+
+    response = user_client.post(RECIPES_URL, data, format='json')
+
+    assert response.status_code == 400
+    assert not Recipe.objects.exists()
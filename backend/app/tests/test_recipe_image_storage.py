@@ -0,0 +1,52 @@
+import os
+from io import StringIO
+
+import pytest
+from app.storage import recipe_image_storage
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+IMAGE_NAME = 'recipe/images/image.png'
+HOUR = 60 * 60
+
+
+def make_old(name):
+    path = recipe_image_storage.path(name)
+    old = os.stat(path).st_mtime - 2 * HOUR
+    os.utime(path, (old, old))
+
+
+def collect_recipe_images():
+    call_command('collect_recipe_images', stdout=StringIO())
+
+
+def test_saving_same_content_refreshes_mtime(media_root):
+    name = recipe_image_storage.save(IMAGE_NAME, ContentFile(b'image'))
+    make_old(name)
+    old_mtime = os.stat(recipe_image_storage.path(name)).st_mtime
+
+    assert recipe_image_storage.save(
+        IMAGE_NAME, ContentFile(b'image')
+    ) == name
+    assert os.stat(recipe_image_storage.path(name)).st_mtime > old_mtime
+
+
+@pytest.mark.django_db
+def test_reused_file_survives_collection(media_root):
+    name = recipe_image_storage.save(IMAGE_NAME, ContentFile(b'image'))
+    make_old(name)
+
+    recipe_image_storage.save(IMAGE_NAME, ContentFile(b'image'))
+    collect_recipe_images()
+
+    assert recipe_image_storage.exists(name)
+
+
+@pytest.mark.django_db
+def test_old_unreferenced_file_is_collected(media_root):
+    name = recipe_image_storage.save(IMAGE_NAME, ContentFile(b'image'))
+    make_old(name)
+
+    collect_recipe_images()
+
+    assert not recipe_image_storage.exists(name)
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+import pytest
+from app.images import process_recipe_image
+from app.models import Recipe
+from app.serializers import RecipeSerializer
+from app.storage import recipe_image_storage
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+RECIPES_URL = '/api/recipes/'
+PROCESSED = {
+    'image': 'recipe/images/ab/processed.png',
+    'thumbnails': {'320': {'webp': 'recipe/thumbnails/processed_320.webp'}},
+}
+
+
+def store_image(recipe, content):
+    name = recipe_image_storage.save(
+        'recipe/images/image.png', ContentFile(content)
+    )
+    Recipe.objects.filter(pk=recipe.pk).update(
+        image=name, image_status=Recipe.ImageStatus.pending
+    )
+
+
+def encode_png():
+    buffer = BytesIO()
+    Image.new('RGB', (400, 300), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+def test_create_stores_original_and_marks_image_as_pending(
+    user_client, recipe_data
+):
+    response = user_client.post(RECIPES_URL, recipe_data(), format='json')
+
+    assert response.status_code == 201
+    assert response.json()['image_status'] == Recipe.ImageStatus.pending
+    recipe = Recipe.objects.get(pk=response.json()['id'])
+    assert recipe_image_storage.exists(recipe.image.name)
+
+
+@pytest.mark.django_db
+def test_update_keeps_image_written_by_worker(user, recipes):
+    stale = Recipe.objects.get(pk=recipes[0].pk)
+    Recipe.objects.filter(pk=stale.pk).update(
+        image_status=Recipe.ImageStatus.ready, **PROCESSED
+    )
+    serializer = RecipeSerializer(
+        stale, data={'name': 'Новое название'}, partial=True
+    )
+    serializer.is_valid(raise_exception=True)
+
+    serializer.save()
+
+    recipe = Recipe.objects.get(pk=stale.pk)
+    assert recipe.name == 'Новое название'
+    assert recipe.image.name == PROCESSED['image']
+    assert recipe.thumbnails == PROCESSED['thumbnails']
+
+
+@pytest.mark.django_db
+def test_failed_processing_is_visible(media_root, recipes):
+    recipe = recipes[0]
+    store_image(recipe, b'not an image')
+
+    process_recipe_image(recipe.id)
+
+    recipe.refresh_from_db()
+    assert recipe.image_status == Recipe.ImageStatus.failed
+
+
+@pytest.mark.django_db
+def test_processing_marks_image_as_ready(media_root, recipes):
+    recipe = recipes[0]
+    store_image(recipe, encode_png())
+
+    process_recipe_image(recipe.id)
+
+    recipe.refresh_from_db()
+    assert recipe.image_status == Recipe.ImageStatus.ready
+    assert set(recipe.thumbnails) == {'320'}
+
+
+@pytest.mark.django_db
+def test_stale_pending_image_is_reprocessed(media_root, recipes):
+    stale, fresh = recipes[:2]
+    store_image(stale, encode_png())
+    store_image(fresh, encode_png())
+    Recipe.objects.filter(pk=stale.pk).update(
+        updated_at=timezone.now() - timedelta(hours=1)
+    )
+
+    call_command('reprocess_recipe_images', stdout=StringIO())
+
+    stale.refresh_from_db()
+    fresh.refresh_from_db()
+    assert stale.image_status == Recipe.ImageStatus.ready
+    assert stale.thumbnails
+    assert fresh.image_status == Recipe.ImageStatus.pending
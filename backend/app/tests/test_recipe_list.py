@@ -0,0 +1,52 @@
+import pytest
+from app.models import Favorite, Shopping
+from users.models import Follow
+
+RECIPES_URL = '/api/recipes/'
+# COUNT, рецепты с авторами и флагами, ингредиенты рецептов,
+# сами ингредиенты, теги.
+RECIPE_LIST_QUERIES = 5
+
+
+@pytest.fixture
+def marked_recipes(user, authors, recipes):
+    for recipe in recipes[::2]:
+        Favorite.objects.create(user=user, recipe=recipe)
+        Shopping.objects.create(user=user, recipe=recipe)
+    Follow.objects.create(user=user, author=authors[0])
+    return recipes
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('limit', (6, 50))
+def test_recipe_list_query_count_does_not_depend_on_page_size(
+    user_client, marked_recipes, django_assert_num_queries, limit
+):
+    with django_assert_num_queries(RECIPE_LIST_QUERIES):
+        response = user_client.get(RECIPES_URL, {'limit': limit})
+
+    assert response.status_code == 200
+    assert len(response.json()['results']) == limit
+
+
+@pytest.mark.django_db
+def test_recipe_list_flags_come_from_annotations(user_client, marked_recipes):
+    response = user_client.get(RECIPES_URL, {'limit': 50})
+
+    for item in response.json()['results']:
+        marked = item['id'] in {recipe.id for recipe in marked_recipes[::2]}
+        assert item['is_favorited'] is marked
+        assert item['is_in_shopping_cart'] is marked
+        assert item['author']['is_subscribed'] is (
+            item['author']['username'] == 'author0'
+        )
+
+
+@pytest.mark.django_db
+def test_anonymous_recipe_list_has_no_marks(client, marked_recipes):
+    response = client.get(RECIPES_URL)
+
+    assert response.status_code == 200
+    for item in response.json()['results']:
+        assert item['is_favorited'] is False
+        assert item['is_in_shopping_cart'] is False
@@ -0,0 +1,17 @@
+import pytest
+from app.models import Favorite, Recipe, Shopping
+
+
+@pytest.mark.django_db
+def test_save_keeps_counters_changed_elsewhere(user, recipes):
+    recipe = Recipe.objects.get(pk=recipes[0].pk)
+    Favorite.objects.create(user=user, recipe=recipe)
+    Shopping.objects.create(user=user, recipe=recipe)
+
+    recipe.name = 'Новое название'
+    recipe.save()
+
+    recipe.refresh_from_db()
+    assert recipe.name == 'Новое название'
+    assert recipe.favorites_count == 1
+    assert recipe.in_carts_count == 1
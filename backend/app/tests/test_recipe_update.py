@@ -0,0 +1,124 @@
+import pytest
+from app.cart_items import get_expected_cart_items, get_stored_cart_items
+from app.models import RecipeIngredients, Shopping
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+RECIPE_URL = '/api/recipes/{}/'
+RECIPE_INGREDIENTS_TABLE = RecipeIngredients._meta.db_table
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+# Рецепт, его ингредиенты и теги, проверка ингредиентов, SAVEPOINT,
+# удаление, изменение и добавление строк ингредиентов, корзины с рецептом,
+# изменение сводных списков покупок (SAVEPOINT, вставка, изменение,
+# удаление, RELEASE SAVEPOINT), отметка изменения рецепта,
+# RELEASE SAVEPOINT, ингредиенты и теги для ответа.
+RECIPE_UPDATE_QUERIES = 20
+
+
+@pytest.fixture
+def own_recipe(user, tags, ingredients, create_recipe):
+    recipe = create_recipe(user, tags[:1], ingredients[:5])
+    Shopping.objects.create(user=user, recipe=recipe)
+    return recipe
+
+
+def current_amounts(recipe):
+    return dict(
+        recipe.recipe_ingredients.values_list('ingredient_id', 'amount')
+    )
+
+
+def patch_ingredients(client, recipe, amounts):
+    """
+    Изменение ингредиентов рецепта. Возвращает ответ и список
+    изменяющих запросов к таблице ингредиентов рецептов.
+    """
+    with CaptureQueriesContext(connection) as context:
+        response = client.patch(
+            RECIPE_URL.format(recipe.id),
+            {
+                'ingredients': [
+                    {'id': ingredient_id, 'amount': amount}
+                    for ingredient_id, amount in amounts.items()
+                ]
+            },
+            format='json'
+        )
+    writes = [
+        query['sql'].split()[0]
+        for query in context.captured_queries
+        if query['sql'].startswith(WRITE_STATEMENTS)
+        and RECIPE_INGREDIENTS_TABLE in query['sql'].split('WHERE')[0]
+    ]
+    return response, writes
+
+
+def assert_cart_matches(user):
+    assert get_stored_cart_items([user.id]) == get_expected_cart_items(
+        [user.id]
+    )
+
+
+@pytest.mark.django_db
+def test_unchanged_ingredients_are_not_written(user, user_client, own_recipe):
+    amounts = current_amounts(own_recipe)
+
+    response, writes = patch_ingredients(user_client, own_recipe, amounts)
+
+    assert response.status_code == 200
+    assert writes == []
+    assert current_amounts(own_recipe) == amounts
+    assert_cart_matches(user)
+
+
+@pytest.mark.django_db
+def test_partial_edit_writes_only_differences(
+    user, user_client, own_recipe, ingredients
+):
+    amounts = current_amounts(own_recipe)
+    changed, removed = list(amounts)[:2]
+    amounts[changed] += 10
+    del amounts[removed]
+    amounts[ingredients[10].id] = 7
+
+    response, writes = patch_ingredients(user_client, own_recipe, amounts)
+
+    assert response.status_code == 200
+    assert sorted(writes) == ['DELETE', 'INSERT', 'UPDATE']
+    assert current_amounts(own_recipe) == amounts
+    assert_cart_matches(user)
+
+
+@pytest.mark.django_db
+def test_full_replacement_uses_one_delete_and_one_insert(
+    user, user_client, own_recipe, ingredients
+):
+    amounts = {ingredient.id: 3 for ingredient in ingredients[20:25]}
+
+    response, writes = patch_ingredients(user_client, own_recipe, amounts)
+
+    assert response.status_code == 200
+    assert sorted(writes) == ['DELETE', 'INSERT']
+    assert current_amounts(own_recipe) == amounts
+    assert_cart_matches(user)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', (3, 30))
+def test_ingredient_edit_query_count_does_not_depend_on_ingredients(
+    user, user_client, tags, ingredients, create_recipe,
+    django_assert_num_queries, count
+):
+    recipe = create_recipe(user, tags[:1], ingredients[:count])
+    Shopping.objects.create(user=user, recipe=recipe)
+    amounts = {
+        ingredient.id: 100
+        for ingredient in ingredients[count // 2:count + count // 2]
+    }
+
+    with django_assert_num_queries(RECIPE_UPDATE_QUERIES):
+        response = patch_ingredients(user_client, recipe, amounts)[0]
+
+    assert response.status_code == 200
+    assert current_amounts(recipe) == amounts
+    assert_cart_matches(user)
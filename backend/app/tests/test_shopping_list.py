@@ -0,0 +1,74 @@
+import os
+
+import pytest
+from app.models import Shopping
+from app.shopping_list_cache import (cache_shopping_list, get_cart_etag,
+                                     get_temp_dir, invalidate_shopping_list)
+
+RECIPE_URL = '/api/recipes/{}/'
+DOWNLOAD_URL = '/api/recipes/download_shopping_cart/'
+
+
+@pytest.mark.django_db
+def test_cart_etag_changes_when_ingredient_is_renamed(user, recipes):
+    Shopping.objects.create(user=user, recipe=recipes[0])
+    etag = get_cart_etag(user)
+
+    ingredient = recipes[0].ingredients.first()
+    ingredient.name = 'Новое название'
+    ingredient.save()
+
+    assert get_cart_etag(user) != etag
+
+
+@pytest.mark.django_db
+def test_cart_etag_ignores_unrelated_ingredients(user, recipes, ingredients):
+    Shopping.objects.create(user=user, recipe=recipes[0])
+    etag = get_cart_etag(user)
+
+    ingredients[-1].name = 'Новое название'
+    ingredients[-1].save()
+
+    assert get_cart_etag(user) == etag
+
+
+@pytest.mark.django_db
+def test_recipe_hides_service_fields(user_client, recipes):
+    response = user_client.get(RECIPE_URL.format(recipes[0].id))
+
+    assert response.status_code == 200
+    for field in ('updated_at', 'favorites_count', 'in_carts_count'):
+        assert field not in response.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('media_type', ('application/pdf', 'text/csv'))
+def test_download_error_is_labelled_as_json(client, media_type):
+    response = client.get(DOWNLOAD_URL, HTTP_ACCEPT=media_type)
+
+    assert response.status_code == 401
+    assert response['Content-Type'] == 'application/json'
+    assert 'detail' in response.json()
+
+
+@pytest.mark.django_db
+def test_cache_survives_concurrent_invalidation(
+    user, settings, tmp_path, monkeypatch
+):
+    settings.PROTECTED_MEDIA_ROOT = tmp_path
+    replace = os.replace
+    calls = []
+
+    def racing_replace(source, destination):
+        if not calls:
+            invalidate_shopping_list(user.id)
+        calls.append(destination)
+        return replace(source, destination)
+
+    monkeypatch.setattr(os, 'replace', racing_replace)
+
+    path = cache_shopping_list(user, 'etag', 'pdf', [b'%PDF', b'-1.4'])
+
+    assert len(calls) == 2
+    assert path.read_bytes() == b'%PDF-1.4'
+    assert not any(get_temp_dir().iterdir())
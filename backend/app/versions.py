@@ -0,0 +1,38 @@
+from app.models import DataVersion
+from django.db.models import F
+
+INGREDIENTS_VERSION = 'ingredients'
+TAGS_VERSION = 'tags'
+
+
+def get_version(name):
+    """
+    Функция получения текущей версии набора данных.
+    Версии хранятся в базе, поэтому изменение из любого процесса,
+    в том числе из management-команды, видно всем воркерам.
+    """
+    version = DataVersion.objects.filter(
+        name=name
+    ).values_list(
+        'version', flat=True
+    ).first()
+    return version or 1
+
+
+def bump_version(name):
+    """
+    Функция увеличения версии набора данных после его изменения.
+    Новая версия становится видна вместе с транзакцией,
+    изменившей данные.
+    """
+    updated = DataVersion.objects.filter(
+        name=name
+    ).update(
+        version=F('version') + 1
+    )
+    if not updated:
+        _, created = DataVersion.objects.get_or_create(
+            name=name, defaults={'version': 2}
+        )
+        if not created:
+            bump_version(name)
@@ -1,25 +1,45 @@
-from app.filters import IngredientFilter, RecipeFilter
-from app.generate_shopping_cart import generate_shopping_list
-from app.models import (Favorite, Ingredient, Recipe, RecipeIngredients,
-                        Shopping, Tag)
-from app.pagination import CustomPagination
+from pathlib import PurePosixPath
+
+from app.autocomplete import ingredient_autocomplete
+from app.bulk import delete_rows
+from app.cart_items import get_shopping_items, sync_cart_items
+from app.counters import recompute_counters
+from app.exporters import EXPORTERS
+from app.filters import IngredientFilter, RecipeFilter, RecipeOrderingFilter
+from app.mixins import VersionedCacheMixin
+from app.models import Favorite, Ingredient, Recipe, Shopping, Tag
+from app.pagination import FeedPagination
 from app.permissions import IsAuthorOrReadOnly, ReadOnly
-from app.serializers import (IngredientSerializer, RecipeCreateSerializer,
-                             RecipeFavoriteSerializer, RecipeSerializer,
-                             TagSerializer)
-from django.db.models import Sum
-from django.http import HttpResponse
+from app.renderers import SHOPPING_LIST_RENDERERS, PassthroughRenderer
+from app.sendfile import sendfile_response
+from app.serializers import (BatchIdsSerializer, IngredientSerializer,
+                             RecipeCreateSerializer, RecipeFavoriteSerializer,
+                             RecipeSerializer, TagSerializer)
+from app.shopping_list_cache import (cache_shopping_list,
+                                     get_cached_shopping_list, get_cart_etag,
+                                     invalidate_shopping_list)
+from app.versions import INGREDIENTS_VERSION, TAGS_VERSION
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Exists, OuterRef, Value
+from django.http import Http404, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
+from users.models import Follow
 
 
-class IngredientViewSet(ModelViewSet):
+class IngredientViewSet(VersionedCacheMixin, ModelViewSet):
     """
     Чтение ингредиентов и фильтрация по названию.
     """
+    cache_version_name = INGREDIENTS_VERSION
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filter_backends = (DjangoFilterBackend,)
@@ -27,11 +47,21 @@ class IngredientViewSet(ModelViewSet):
     http_method_names = ('get',)
     permission_classes = (ReadOnly,)
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name and settings.INGREDIENT_AUTOCOMPLETE_IN_MEMORY:
+            return self.get_cached_response(
+                request,
+                lambda: Response(ingredient_autocomplete.search(name))
+            )
+        return super().list(request, *args, **kwargs)
+
 
-class TagViewSet(ModelViewSet):
+class TagViewSet(VersionedCacheMixin, ModelViewSet):
     """
     Чтение тегов.
     """
+    cache_version_name = TAGS_VERSION
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     http_method_names = ('get',)
@@ -48,10 +78,13 @@ class RecipeViewSet(ModelViewSet):
     """
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
-    filter_backends = (DjangoFilterBackend,)
-    pagination_class = CustomPagination
+    filter_backends = (DjangoFilterBackend, RecipeOrderingFilter)
+    pagination_class = FeedPagination
     filterset_class = RecipeFilter
+    ordering_fields = ('favorites_count', 'in_carts_count', 'id')
+    ordering = ('-id',)
     http_method_names = ('get', 'patch', 'delete', 'post')
+    lookup_value_regex = r'\d+'
     permission_classes_by_action = {
         'create': [permissions.IsAuthenticated],
         'update': [IsAuthorOrReadOnly],
@@ -61,21 +94,122 @@ class RecipeViewSet(ModelViewSet):
     }
 
     def get_queryset(self):
-        recipes = Recipe.objects.prefetch_related(
+        recipes = Recipe.objects.select_related('author').prefetch_related(
             'recipe_ingredients__ingredient', 'tags'
         )
-        return recipes
+        user = self.request.user
+
+        if not user.is_authenticated:
+            not_marked = Value(False, output_field=BooleanField())
+            return recipes.annotate(
+                favorited=not_marked,
+                in_shopping_cart=not_marked,
+                author_subscribed=not_marked,
+            )
+
+        return recipes.annotate(
+            favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            in_shopping_cart=Exists(
+                Shopping.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            author_subscribed=Exists(
+                Follow.objects.filter(user=user, author=OuterRef('author'))
+            ),
+        )
 
     def get_serializer_class(self):
         if self.action == 'create':
             return RecipeCreateSerializer
-        elif self.action == 'favorite' or self.action == 'shopping':
+        elif self.action in (
+            'favorite', 'shopping', 'favorite_batch', 'shopping_batch'
+        ):
             return RecipeFavoriteSerializer
         return RecipeSerializer
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def batch_update_marks(self, request, model):
+        """
+        Функция пакетного добавления и удаления рецептов
+        в избранном или списке покупок в одной транзакции.
+        """
+        serializer = BatchIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        user = request.user
+
+        if request.method == 'DELETE':
+            with transaction.atomic():
+                # Удаление без сигналов по каждой строке: счетчики
+                # и сводный список пересчитываются по таблицам один раз.
+                deleted = delete_rows(model.objects.filter(
+                    user=user,
+                    recipe_id__in=ids
+                ))
+                recompute_counters(Recipe.objects.filter(id__in=ids))
+                if model is Shopping:
+                    sync_cart_items([user.id])
+            if model is Shopping:
+                invalidate_shopping_list(user.id)
+            return Response({'deleted': deleted}, status=status.HTTP_200_OK)
+
+        with transaction.atomic():
+            recipes = list(
+                Recipe.objects.filter(id__in=ids).only(
+                    'id', 'name', 'image', 'thumbnails', 'image_status',
+                    'cooking_time'
+                )
+            )
+            missing = set(ids) - {recipe.id for recipe in recipes}
+            if missing:
+                return Response(
+                    {'ids': [f'Рецепты не найдены: {sorted(missing)}.']},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            marked = set(
+                model.objects.filter(
+                    user=user,
+                    recipe_id__in=ids
+                ).values_list('recipe_id', flat=True)
+            )
+            new_ids = [
+                recipe.id for recipe in recipes if recipe.id not in marked
+            ]
+            model.objects.bulk_create(
+                [
+                    model(user=user, recipe_id=recipe_id)
+                    for recipe_id in new_ids
+                ],
+                ignore_conflicts=True
+            )
+            # Строки, которые успел добавить параллельный запрос,
+            # bulk_create пропускает, поэтому счетчики и сводный список
+            # пересчитываются по таблицам, а не по new_ids.
+            recompute_counters(Recipe.objects.filter(id__in=new_ids))
+            if model is Shopping:
+                sync_cart_items([user.id])
+        if model is Shopping:
+            invalidate_shopping_list(user.id)
+
+        serializer = self.get_serializer(recipes, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def get_short_recipe(self, pk):
+        """
+        Функция получения рецепта только с полями краткой карточки.
+        """
+        return get_object_or_404(
+            Recipe.objects.only(
+                'id', 'name', 'image', 'thumbnails', 'image_status',
+                'cooking_time'
+            ),
+            pk=pk
+        )
+
     @action(
         detail=True,
         methods=['post', 'delete'],
@@ -86,27 +220,33 @@ class RecipeViewSet(ModelViewSet):
         """
         Функция добавления и удаления рецепта в избранное.
         """
-        recipe = self.get_object()
         user = request.user
 
         if request.method == 'POST':
-            Favorite.objects.get_or_create(user=user, recipe=recipe)
+            recipe = self.get_short_recipe(pk)
+            try:
+                with transaction.atomic():
+                    Favorite.objects.create(user=user, recipe=recipe)
+            except IntegrityError:
+                pass
             serializer = self.get_serializer(recipe)
             return Response(serializer.data, status=201)
 
         elif request.method == 'DELETE':
-            try:
-                favorite = Favorite.objects.get(user=user, recipe=recipe)
-                favorite.delete()
-                return Response(
-                    {'detail': 'Рецепт удален из ибранного.'},
-                    status=204
-                )
-            except Favorite.DoesNotExist:
+            deleted, _ = Favorite.objects.filter(
+                user=user,
+                recipe_id=pk
+            ).delete()
+
+            if not deleted:
                 return Response(
                     {'detail': 'Рецепта нет в избранном.'},
                     status=404
                 )
+            return Response(
+                {'detail': 'Рецепт удален из ибранного.'},
+                status=204
+            )
 
     @action(
         detail=True,
@@ -118,16 +258,14 @@ class RecipeViewSet(ModelViewSet):
         """
         Функция добавления и удаления рецепта в списке покупок.
         """
-        recipe = self.get_object()
         user = request.user
 
         if request.method == 'POST':
-            shopping_obj, created = Shopping.objects.get_or_create(
-                user=user,
-                recipe=recipe
-            )
-
-            if not created:
+            recipe = self.get_short_recipe(pk)
+            try:
+                with transaction.atomic():
+                    Shopping.objects.create(user=user, recipe=recipe)
+            except IntegrityError:
                 return Response(
                     {"error": "Этот рецепт уже добавлен в список покупок!"},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -137,55 +275,138 @@ class RecipeViewSet(ModelViewSet):
             return Response(serializer.data, status=201)
 
         elif request.method == 'DELETE':
-            try:
-                shopping_obj = Shopping.objects.get(user=user, recipe=recipe)
-                shopping_obj.delete()
-                return Response(
-                    {'detail': 'Рецепт удален из списка покупок.'},
-                    status=204
-                )
-            except Favorite.DoesNotExist:
+            deleted, _ = Shopping.objects.filter(
+                user=user,
+                recipe_id=pk
+            ).delete()
+
+            if not deleted:
                 return Response(
                     {'detail': 'Рецепта нет в списке покупок.'},
                     status=404
                 )
+            return Response(
+                {'detail': 'Рецепт удален из списка покупок.'},
+                status=204
+            )
 
     @action(
         detail=False,
-        methods=["get"],
+        methods=['post', 'delete'],
+        url_path='favorite',
+        permission_classes=(permissions.IsAuthenticated,)
+    )
+    def favorite_batch(self, request):
+        """
+        Функция пакетного добавления и удаления рецептов в избранное.
+        """
+        return self.batch_update_marks(request, Favorite)
+
+    @action(
+        detail=False,
+        methods=['post', 'delete'],
+        url_path='shopping_cart',
         permission_classes=(permissions.IsAuthenticated,)
     )
+    def shopping_batch(self, request):
+        """
+        Функция пакетного добавления и удаления рецептов
+        в списке покупок.
+        """
+        return self.batch_update_marks(request, Shopping)
+
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path='image',
+        permission_classes=(permissions.AllowAny,),
+        renderer_classes=(JSONRenderer, PassthroughRenderer)
+    )
+    def image(self, request, pk=None):
+        """
+        Функция получения изображения рецепта или его уменьшенной
+        копии: ?width=320&type=webp. Файл отдает прокси-сервер.
+        """
+        recipe = get_object_or_404(
+            Recipe.objects.only('id', 'image', 'thumbnails'),
+            pk=pk
+        )
+        width = request.query_params.get('width')
+        if width is None:
+            name = recipe.image.name
+        else:
+            name = recipe.thumbnails.get(width, {}).get(
+                request.query_params.get('type', 'webp')
+            )
+        if not name:
+            raise Http404('Изображение не найдено.')
+
+        quoted_etag = quote_etag(PurePosixPath(name).stem)
+        if_none_match = request.headers.get('If-None-Match', '')
+        if quoted_etag in parse_etags(if_none_match):
+            response = HttpResponseNotModified()
+        else:
+            response = sendfile_response(recipe.image.storage.path(name))
+        response['ETag'] = quoted_etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=(permissions.IsAuthenticated,),
+        renderer_classes=SHOPPING_LIST_RENDERERS
+    )
     def download_shopping_cart(self, request):
         """
         Функция скачивания списка покупок.
+        Формат выбирается параметром format или заголовком Accept.
         """
         user = request.user
-        shop_cart = Shopping.objects.filter(user=user)
+        exporter = EXPORTERS[request.accepted_renderer.format]
+        cart_etag = get_cart_etag(user)
 
-        if not shop_cart:
+        if cart_etag is None:
             return Response(
                 {'message': 'Список покупок пуст!'},
-                status=status.HTTP_200_OK
+                status=status.HTTP_200_OK,
+                content_type='application/json'
             )
 
-        recipe_ids = shop_cart.values_list('recipe', flat=True)
-
-        ingredients_data = RecipeIngredients.objects.filter(
-            recipe__in=recipe_ids
-        ).values_list(
-            'ingredient__name',
-            'ingredient__measurement_unit',
-        ).annotate(
-            amount=Sum('amount')
-        )
-
-        pdf_buffer = generate_shopping_list(ingredients_data)
+        etag = f'{cart_etag}-{exporter.format}'
+        quoted_etag = quote_etag(etag)
+        if_none_match = request.headers.get('If-None-Match', '')
+        if quoted_etag in parse_etags(if_none_match):
+            response = HttpResponseNotModified()
+            response['ETag'] = quoted_etag
+            patch_vary_headers(response, ('Accept',))
+            return response
 
-        response = HttpResponse(
-            pdf_buffer.getvalue(),
-            content_type='application/pdf'
+        if exporter.cacheable:
+            path = get_cached_shopping_list(user, etag, exporter.format)
+            if path is None:
+                path = cache_shopping_list(
+                    user,
+                    etag,
+                    exporter.format,
+                    exporter.export(get_shopping_items(user))
+                )
+            response = sendfile_response(
+                path,
+                filename=f'shopping_list.{exporter.format}',
+                content_type=exporter.media_type,
+                as_attachment=True
+            )
+        else:
+            response = StreamingHttpResponse(
+                exporter.export(get_shopping_items(user)),
+                content_type=exporter.media_type
+            )
+        attachment = (
+            f'attachment; filename="shopping_list.{exporter.format}"'
         )
-        attachment = 'attachment; filename="shopping_list.pdf"'
         response['Content-Disposition'] = attachment
+        response['ETag'] = quoted_etag
+        patch_vary_headers(response, ('Accept',))
 
         return response
@@ -0,0 +1,102 @@
+"""
+Бенчмарк пакетных запросов: N отдельных запросов на добавление
+рецептов в избранное и список покупок против одного пакетного,
+а также пакетное удаление.
+
+    python -m benchmarks.batch_marks
+"""
+import time
+
+from benchmarks.utils import setup_django, test_database
+
+BATCH_SIZES = (10, 100)
+INGREDIENTS_PER_RECIPE = 10
+ENDPOINTS = ('favorite', 'shopping_cart')
+
+
+def create_recipes(count):
+    from app.models import Ingredient, Recipe, RecipeIngredients
+    from users.models import User
+
+    author = User.objects.create_user(
+        username='author', email='author@foodgram.ru', password='password'
+    )
+    ingredients = [
+        Ingredient.objects.create(name=f'Ингредиент {number}')
+        for number in range(INGREDIENTS_PER_RECIPE * 3)
+    ]
+    recipes = []
+    for number in range(count):
+        recipe = Recipe.objects.create(
+            author=author,
+            name=f'Рецепт {number}',
+            text='Описание',
+            cooking_time=10,
+        )
+        RecipeIngredients.objects.bulk_create(
+            RecipeIngredients(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients[
+                number % 3 * INGREDIENTS_PER_RECIPE:
+            ][:INGREDIENTS_PER_RECIPE]
+        )
+        recipes.append(recipe.id)
+    return recipes
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    setup_django()
+    from rest_framework.test import APIClient
+    from users.models import User
+
+    with test_database():
+        recipe_ids = create_recipes(max(BATCH_SIZES))
+        user = User.objects.create_user(
+            username='user', email='user@foodgram.ru', password='password'
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        for endpoint in ENDPOINTS:
+            # Прогрев: первые запросы к эндпоинтам заметно медленнее.
+            client.post(f'/api/recipes/{recipe_ids[0]}/{endpoint}/')
+            client.delete(f'/api/recipes/{recipe_ids[0]}/{endpoint}/')
+            client.post(
+                f'/api/recipes/{endpoint}/', {'ids': recipe_ids[:1]},
+                format='json'
+            )
+            client.delete(
+                f'/api/recipes/{endpoint}/', {'ids': recipe_ids[:1]},
+                format='json'
+            )
+
+            for size in BATCH_SIZES:
+                ids = recipe_ids[:size]
+                single = timed(lambda: [
+                    client.post(f'/api/recipes/{recipe_id}/{endpoint}/')
+                    for recipe_id in ids
+                ])
+                client.delete(
+                    f'/api/recipes/{endpoint}/', {'ids': ids}, format='json'
+                )
+                batch = timed(lambda: client.post(
+                    f'/api/recipes/{endpoint}/', {'ids': ids}, format='json'
+                ))
+                batch_delete = timed(lambda: client.delete(
+                    f'/api/recipes/{endpoint}/', {'ids': ids}, format='json'
+                ))
+                print(
+                    f'{endpoint:<14} {size:>4} рецептов: '
+                    f'{size} запросов {single:8.1f} ms, '
+                    f'один пакетный {batch:8.1f} ms, '
+                    f'пакетное удаление {batch_delete:8.1f} ms'
+                )
+
+
+if __name__ == '__main__':
+    main()
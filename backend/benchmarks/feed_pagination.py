@@ -0,0 +1,89 @@
+"""
+Бенчмарк ленты рецептов: задержка первой и 10 000-й страницы
+при постраничной выдаче (COUNT и OFFSET) и в режиме курсора.
+
+    python -m benchmarks.feed_pagination
+"""
+from benchmarks.utils import measure, report, setup_django, test_database
+
+PAGE_SIZE = 6
+DEEP_PAGE = 10000
+RECIPE_COUNT = PAGE_SIZE * DEEP_PAGE
+BATCH_SIZE = 5000
+REPEAT = 20
+RECIPES_URL = '/api/recipes/'
+
+
+def create_recipes():
+    from app.models import Recipe
+    from users.models import User
+
+    author = User.objects.create_user(
+        username='author', email='author@foodgram.ru', password='password'
+    )
+    for start in range(0, RECIPE_COUNT, BATCH_SIZE):
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=author,
+                name=f'Рецепт {number}',
+                text='Описание',
+                cooking_time=10,
+            )
+            for number in range(start, min(start + BATCH_SIZE, RECIPE_COUNT))
+        )
+
+
+def get_cursor(page):
+    """
+    Функция построения курсора на начало страницы:
+    позиция курсора - id последнего рецепта предыдущей страницы.
+    """
+    from app.models import Recipe
+    from app.pagination import FeedCursorPagination
+    from rest_framework.pagination import Cursor
+
+    if page == 1:
+        return ''
+
+    position = Recipe.objects.order_by('-id').values_list(
+        'id', flat=True
+    )[(page - 1) * PAGE_SIZE - 1]
+    paginator = FeedCursorPagination()
+    paginator.base_url = RECIPES_URL
+    url = paginator.encode_cursor(
+        Cursor(offset=0, reverse=False, position=str(position))
+    )
+    return url.split(f'{paginator.cursor_query_param}=', 1)[1]
+
+
+def main():
+    setup_django()
+    from rest_framework.test import APIClient
+
+    with test_database():
+        create_recipes()
+        client = APIClient()
+
+        for page in (1, DEEP_PAGE):
+            params = {'limit': PAGE_SIZE, 'page': page}
+            first_recipe = client.get(RECIPES_URL, params).json()[
+                'results'
+            ][0]
+            report(
+                f'страница {page}, COUNT и OFFSET',
+                measure(lambda: client.get(RECIPES_URL, params), REPEAT)
+            )
+
+            cursor_params = {'limit': PAGE_SIZE, 'cursor': get_cursor(page)}
+            response = client.get(RECIPES_URL, cursor_params).json()
+            assert response['results'][0] == first_recipe
+            report(
+                f'страница {page}, курсор',
+                measure(
+                    lambda: client.get(RECIPES_URL, cursor_params), REPEAT
+                )
+            )
+
+
+if __name__ == '__main__':
+    main()
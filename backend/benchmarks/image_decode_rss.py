@@ -0,0 +1,163 @@
+"""
+Бенчмарк пикового RSS и времени проверки изображения из base64
+для PNG размером 1, 5 и 20 МБ, а также для WebP и GIF 6000x6000,
+которые при небольшом размере файла распаковываются в сотни
+мегабайт пикселей. Каждый замер выполняется
+в отдельном процессе, пик сбрасывается через /proc/self/clear_refs
+после чтения запроса, поэтому бенчмарк работает только на Linux.
+Если установлен drf_base64, для сравнения замеряется и его поле.
+
+    python -m benchmarks.image_decode_rss
+"""
+import argparse
+import base64
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from benchmarks.utils import setup_django
+
+PAYLOAD_SIZES_MB = (1, 5, 20)
+LARGE_IMAGE_FORMATS = ('WEBP', 'GIF')
+LARGE_IMAGE_SIDE = 6000
+MAX_SIZE = 32 * 1024 * 1024
+
+
+def to_data_uri(content, image_format):
+    return (
+        f'data:image/{image_format.lower()};base64,'
+        f'{base64.b64encode(content).decode()}'
+    )
+
+
+def make_payload(size_mb):
+    """
+    Функция создания data-URI с PNG из шума: шум не сжимается,
+    поэтому размер файла близок к размеру пикселей.
+    """
+    from PIL import Image
+
+    side = int((size_mb * 1024 * 1024 / 3) ** 0.5)
+    buffer = BytesIO()
+    Image.frombytes(
+        'RGB', (side, side), os.urandom(side * side * 3)
+    ).save(buffer, 'PNG', compress_level=0)
+    return to_data_uri(buffer.getvalue(), 'PNG')
+
+
+def make_large_image_payload(image_format):
+    """
+    Функция создания data-URI с градиентом LARGE_IMAGE_SIDE пикселей
+    по стороне: файл сжимается в килобайты, а пиксели занимают
+    больше 100 МБ.
+    """
+    from PIL import Image
+
+    image = Image.linear_gradient('L').resize(
+        (LARGE_IMAGE_SIDE, LARGE_IMAGE_SIDE)
+    ).convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, image_format)
+    return to_data_uri(buffer.getvalue(), image_format)
+
+
+def make_payloads():
+    for size_mb in PAYLOAD_SIZES_MB:
+        yield f'PNG {size_mb} МБ', make_payload(size_mb)
+    for image_format in LARGE_IMAGE_FORMATS:
+        yield (
+            f'{image_format} {LARGE_IMAGE_SIDE}x{LARGE_IMAGE_SIDE}',
+            make_large_image_payload(image_format)
+        )
+
+
+def get_field(name):
+    if name == 'drf_base64':
+        from drf_base64.fields import Base64ImageField
+        return Base64ImageField()
+
+    from app.fields import StreamingBase64ImageField
+    return StreamingBase64ImageField()
+
+
+def read_memory_status():
+    """
+    Функция чтения текущего и пикового RSS процесса в килобайтах.
+    """
+    with open('/proc/self/status') as file:
+        status = dict(line.split(':', 1) for line in file)
+    return (
+        int(status['VmRSS'].split()[0]),
+        int(status['VmHWM'].split()[0]),
+    )
+
+
+def reset_peak_memory():
+    with open('/proc/self/clear_refs', 'w') as file:
+        file.write('5')
+
+
+def measure_decode(path, field_name):
+    """
+    Функция замера прироста пикового RSS и времени проверки
+    в текущем процессе. Текст запроса уже прочитан и в прирост
+    не входит.
+    """
+    from django.test.utils import override_settings
+
+    with open(path) as file:
+        payload = file.read()
+    field = get_field(field_name)
+    reset_peak_memory()
+    baseline, _ = read_memory_status()
+
+    started = time.perf_counter()
+    with override_settings(RECIPE_IMAGE_MAX_SIZE=MAX_SIZE):
+        field.to_internal_value(payload)
+    elapsed = time.perf_counter() - started
+
+    _, peak = read_memory_status()
+    print((peak - baseline) / 1024, elapsed * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--payload')
+    parser.add_argument('--field', default='streaming')
+    options = parser.parse_args()
+
+    setup_django()
+    if options.payload:
+        measure_decode(options.payload, options.field)
+        return
+
+    fields = ['streaming']
+    try:
+        import drf_base64  # noqa: F401
+        fields.append('drf_base64')
+    except ImportError:
+        pass
+
+    for label, payload in make_payloads():
+        with tempfile.NamedTemporaryFile('w', suffix='.txt') as file:
+            file.write(payload)
+            file.flush()
+            for field in fields:
+                growth, elapsed = map(float, subprocess.check_output(
+                    [
+                        sys.executable, '-m', __spec__.name,
+                        '--payload', file.name, '--field', field,
+                    ],
+                    text=True
+                ).split())
+                print(
+                    f'{label:<14} {field:<10}: '
+                    f'пиковый RSS +{growth:.1f} МБ, {elapsed:.0f} ms'
+                )
+
+
+if __name__ == '__main__':
+    main()
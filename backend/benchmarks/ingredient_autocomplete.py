@@ -0,0 +1,69 @@
+"""
+Бенчмарк автодополнения ингредиентов: p50/p99 индекса в памяти
+против запроса к базе на справочнике data/ingredients.csv.
+
+    python -m benchmarks.ingredient_autocomplete
+"""
+import random
+from io import StringIO
+from pathlib import Path
+
+from benchmarks.utils import measure, report, setup_django, test_database
+
+INGREDIENTS_FILE = (
+    Path(__file__).resolve().parents[2] / 'data' / 'ingredients.csv'
+)
+QUERY_COUNT = 500
+REPEAT = 5
+
+
+def make_queries(names):
+    """
+    Функция генерации запросов: начала названий длиной
+    от 1 до 5 символов и фрагменты из середины названий.
+    """
+    generator = random.Random(0)
+    queries = []
+    for _ in range(QUERY_COUNT):
+        name = generator.choice(names)
+        length = generator.randint(1, 5)
+        start = generator.choice((0, generator.randrange(len(name))))
+        queries.append(name[start:start + length] or name)
+    return queries
+
+
+def main():
+    setup_django()
+    from app.autocomplete import ingredient_autocomplete
+    from app.filters import IngredientFilter
+    from app.models import Ingredient
+    from django.core.management import call_command
+
+    with test_database():
+        call_command('load_ingredients', INGREDIENTS_FILE, stdout=StringIO())
+        names = list(Ingredient.objects.values_list('name', flat=True))
+        queries = make_queries(names) * REPEAT
+        queryset = Ingredient.objects.all()
+        name_filter = IngredientFilter(queryset=queryset)
+
+        def orm_search(query):
+            return list(name_filter.filter_name(
+                queryset, 'name', query
+            ).values('id', 'name', 'measurement_unit'))
+
+        ingredient_autocomplete.search('')
+        memory_queries = iter(queries)
+        orm_queries = iter(queries)
+        memory = measure(
+            lambda: ingredient_autocomplete.search(next(memory_queries)),
+            len(queries)
+        )
+        orm = measure(lambda: orm_search(next(orm_queries)), len(queries))
+
+        print(f'{len(names)} ингредиентов, {len(queries)} запросов')
+        report('индекс в памяти', memory)
+        report('запрос к базе', orm)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Бенчмарк создания рецептов через API: рецептов в секунду
+и число запросов к базе для рецептов из 1, 10 и 30 ингредиентов.
+
+    python -m benchmarks.recipe_create
+"""
+import tempfile
+import time
+
+from benchmarks.utils import setup_django, test_database
+
+INGREDIENT_COUNTS = (1, 10, 30)
+RECIPE_COUNT = 200
+RECIPES_URL = '/api/recipes/'
+IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAIAAAACCAIAAAD91JpzAAAA'
+    'FklEQVR4nGP8z8DAwMDAxMDAwMDAAAANHQEDasKb6QAAAABJRU5ErkJggg=='
+)
+
+
+def main():
+    setup_django()
+    from app.models import Ingredient, Tag
+    from django.db import connection, reset_queries
+    from django.test.utils import CaptureQueriesContext, override_settings
+    from rest_framework.test import APIClient
+    from users.models import User
+
+    media_root = tempfile.TemporaryDirectory()
+    image_settings = override_settings(
+        MEDIA_ROOT=media_root.name, RECIPE_IMAGE_PROCESSING_SYNC=True
+    )
+    with test_database(), media_root, image_settings:
+        user = User.objects.create_user(
+            username='user', email='user@foodgram.ru', password='password'
+        )
+        tags = [
+            Tag.objects.create(
+                name=f'Тег {number}', color='#FFFFFF', slug=f'tag{number}'
+            ).id
+            for number in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(name=f'Ингредиент {number}').id
+            for number in range(max(INGREDIENT_COUNTS))
+        ]
+        client = APIClient()
+        client.force_authenticate(user)
+
+        for count in INGREDIENT_COUNTS:
+            data = {
+                'name': 'Рецепт',
+                'text': 'Описание',
+                'cooking_time': 10,
+                'image': IMAGE,
+                'tags': tags,
+                'ingredients': [
+                    {'id': ingredient, 'amount': 1}
+                    for ingredient in ingredients[:count]
+                ],
+            }
+            # Лог запросов очищается в начале каждого запроса к API.
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                client.post(RECIPES_URL, data, format='json')
+
+            started = time.perf_counter()
+            for _ in range(RECIPE_COUNT):
+                response = client.post(RECIPES_URL, data, format='json')
+                assert response.status_code == 201, response.content
+            elapsed = time.perf_counter() - started
+
+            print(
+                f'{count:>3} ингредиентов: {RECIPE_COUNT / elapsed:7.1f} '
+                f'рецептов/с, {len(context.captured_queries)} запросов '
+                f'на рецепт'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Бенчмарк генерации PDF со списком покупок:
+время и пиковая память для корзин из 10, 1 000 и 10 000
+сводных ингредиентов.
+
+    python -m benchmarks.shopping_list_pdf
+"""
+import time
+import tracemalloc
+
+from benchmarks.utils import setup_django
+
+CART_SIZES = (10, 1000, 10000)
+
+
+def make_items(size):
+    """
+    Функция генерации строк списка покупок
+    в формате (название, единица измерения, количество).
+    """
+    return [
+        (f'Ингредиент номер {number}', 'г', number % 1000 + 1)
+        for number in range(size)
+    ]
+
+
+def render(items):
+    """
+    Функция рендеринга PDF, возвращает размер файла.
+    """
+    from app.generate_shopping_cart import generate_shopping_list
+
+    with generate_shopping_list(items) as pdf_file:
+        return len(pdf_file.read())
+
+
+def main():
+    setup_django()
+    from app.generate_shopping_cart import register_fonts
+
+    register_fonts()
+    for size in CART_SIZES:
+        items = make_items(size)
+        started = time.perf_counter()
+        pdf_size = render(items)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        # Память меряется отдельным прогоном: tracemalloc
+        # заметно замедляет рендеринг.
+        tracemalloc.start()
+        render(items)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f'{size:>6} ингредиентов: {elapsed:9.1f} ms, '
+            f'пик памяти {peak / 1024:9.1f} KiB, PDF {pdf_size / 1024:.1f} KiB'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Микробенчмарк задержки генерации PDF со списком покупок:
+холодный рендеринг (первый в процессе, с регистрацией шрифта
+и отрисовкой заголовка) против теплого.
+
+    python -m benchmarks.shopping_list_pdf_latency
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from benchmarks.shopping_list_pdf import make_items, render
+from benchmarks.utils import measure, report, setup_django
+
+CART_SIZE = 20
+COLD_RUNS = 10
+WARM_RUNS = 200
+
+
+def cold_render():
+    """
+    Функция одного холодного рендеринга в текущем процессе.
+    """
+    items = make_items(CART_SIZE)
+    started = time.perf_counter()
+    render(items)
+    print((time.perf_counter() - started) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cold', action='store_true')
+    options = parser.parse_args()
+
+    setup_django()
+    if options.cold:
+        cold_render()
+        return
+
+    cold = [
+        float(subprocess.check_output(
+            [sys.executable, '-m', __spec__.name, '--cold'], text=True
+        ))
+        for _ in range(COLD_RUNS)
+    ]
+
+    items = make_items(CART_SIZE)
+    render(items)
+    warm = measure(lambda: render(items), WARM_RUNS)
+
+    report(f'холодный рендеринг, {CART_SIZE} строк', cold)
+    report(f'теплый рендеринг, {CART_SIZE} строк', warm)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Общие функции бенчмарков.
+Бенчмарки запускаются из папки backend как модули:
+
+    python -m benchmarks.shopping_list_pdf
+"""
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """
+    Функция настройки Django для запуска бенчмарка вне manage.py.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """
+    Контекстный менеджер временной базы данных и тестового
+    окружения: бенчмарки не трогают рабочие данные,
+    а тестовый клиент проходит проверку ALLOWED_HOSTS.
+    """
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat):
+    """
+    Функция замера времени вызовов в миллисекундах.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def percentile(values, percent):
+    """
+    Функция вычисления перцентиля по ближайшему рангу.
+    """
+    ordered = sorted(values)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def report(title, timings):
+    """
+    Функция вывода строки с p50 и p99.
+    """
+    print(
+        f'{title:<40} p50 {percentile(timings, 50):8.2f} ms'
+        f'  p99 {percentile(timings, 99):8.2f} ms'
+    )
@@ -0,0 +1,121 @@
+import pytest
+from app.models import Ingredient, Recipe, RecipeIngredients, Tag
+from rest_framework.test import APIClient
+
+IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAIAAAACCAIAAAD91JpzAAAA'
+    'FklEQVR4nGP8z8DAwMDAxMDAwMDAAAANHQEDasKb6QAAAABJRU5ErkJggg=='
+)
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='user',
+        email='user@foodgram.ru',
+        password='password',
+        first_name='Иван',
+        last_name='Иванов',
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def authors(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'author{number}',
+            email=f'author{number}@foodgram.ru',
+            password='password',
+        )
+        for number in range(5)
+    ]
+
+
+@pytest.fixture
+def tags():
+    return [
+        Tag.objects.create(
+            name=f'Тег {number}',
+            color='#FFFFFF',
+            slug=f'tag{number}'
+        )
+        for number in range(3)
+    ]
+
+
+@pytest.fixture
+def ingredients():
+    return [
+        Ingredient.objects.create(
+            name=f'Ингредиент {number}',
+            measurement_unit='г'
+        )
+        for number in range(40)
+    ]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def recipe_data(tags, ingredients, media_root):
+    def recipe_data(ingredient_count=3):
+        return {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': IMAGE,
+            'tags': [tag.id for tag in tags],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': number + 1}
+                for number, ingredient in enumerate(
+                    ingredients[:ingredient_count]
+                )
+            ],
+        }
+    return recipe_data
+
+
+@pytest.fixture
+def create_recipe():
+    def create(author, tags, ingredients, name='Рецепт'):
+        recipe = Recipe.objects.create(
+            author=author,
+            name=name,
+            text='Описание',
+            cooking_time=10,
+        )
+        recipe.tags.set(tags)
+        RecipeIngredients.objects.bulk_create(
+            RecipeIngredients(
+                recipe=recipe,
+                ingredient=ingredient,
+                amount=number + 1
+            )
+            for number, ingredient in enumerate(ingredients)
+        )
+        return recipe
+    return create
+
+
+@pytest.fixture
+def recipes(authors, tags, ingredients, create_recipe):
+    return [
+        create_recipe(
+            authors[number % len(authors)],
+            tags[:number % len(tags) + 1],
+            ingredients[:3],
+            name=f'Рецепт {number}'
+        )
+        for number in range(60)
+    ]
@@ -92,8 +92,10 @@ WSGI_APPLICATION = 'foodgram.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
-        'NAME': os.getenv('POSTGRES_DB'),
+        'ENGINE': os.getenv(
+            'DB_ENGINE', 'django.db.backends.postgresql_psycopg2'
+        ),
+        'NAME': os.getenv('POSTGRES_DB', 'foodgram'),
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
@@ -102,6 +104,28 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'foodgram'),
+    }
+}
+
+CATALOG_CACHE_TIMEOUT = int(
+    os.getenv('CATALOG_CACHE_TIMEOUT', 60 * 60 * 24 * 7)
+)
+
+INGREDIENT_AUTOCOMPLETE_IN_MEMORY = (
+    os.getenv('INGREDIENT_AUTOCOMPLETE_IN_MEMORY', 'False') == 'True'
+)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -147,6 +171,31 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static/")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# File responses
+# nginx - X-Accel-Redirect, sendfile - X-Sendfile, django - FileResponse
+
+SENDFILE_BACKEND = os.getenv('SENDFILE_BACKEND', 'django')
+PROTECTED_MEDIA_ROOT = os.path.join(BASE_DIR, "protected")
+SENDFILE_LOCATIONS = {
+    MEDIA_ROOT: '/internal/media/',
+    PROTECTED_MEDIA_ROOT: '/internal/protected/',
+}
+
+# Recipe images
+
+RECIPE_IMAGE_WORKERS = int(os.getenv('RECIPE_IMAGE_WORKERS', 2))
+RECIPE_THUMBNAIL_WIDTHS = (320, 640, 1280)
+RECIPE_IMAGE_PROCESSING_SYNC = (
+    os.getenv('RECIPE_IMAGE_PROCESSING_SYNC', 'False') == 'True'
+)
+RECIPE_IMAGE_MAX_SIZE = int(
+    os.getenv('RECIPE_IMAGE_MAX_SIZE', 15 * 1024 * 1024)
+)
+RECIPE_IMAGE_MAX_PIXELS = int(
+    os.getenv('RECIPE_IMAGE_MAX_PIXELS', 40_000_000)
+)
+RECIPE_IMAGE_SPOOL_SIZE = 1024 * 1024
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -161,6 +210,16 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Pagination
+
+PAGINATION_COUNT_STRATEGY = os.getenv('PAGINATION_COUNT_STRATEGY', 'exact')
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.getenv('PAGINATION_COUNT_CACHE_TIMEOUT', 30)
+)
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv('PAGINATION_COUNT_ESTIMATE_THRESHOLD', 10000)
+)
+
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'SERIALIZERS': {
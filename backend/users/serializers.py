@@ -5,6 +5,22 @@ from rest_framework import serializers
 from users.models import Follow, User
 
 
+def get_followed_author_ids(context):
+    """
+    Функция получения множества id авторов, на которых подписан
+    текущий пользователь. Множество вычисляется одним запросом
+    и хранится в контексте сериализатора до конца запроса.
+    """
+    if 'followed_author_ids' not in context:
+        user = context['request'].user
+        context['followed_author_ids'] = set() if user.is_anonymous else set(
+            Follow.objects.filter(
+                user=user
+            ).values_list('author_id', flat=True)
+        )
+    return context['followed_author_ids']
+
+
 class SignUpUserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
 
@@ -48,10 +64,9 @@ class CustomUserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        user = self.context["request"].user
-        if not user.is_anonymous:
-            return Follow.objects.filter(user=user, author=obj).exists()
-        return False
+        if hasattr(obj, 'subscribed'):
+            return obj.subscribed
+        return obj.id in get_followed_author_ids(self.context)
 
 
 class CustomUserResetPassword(serializers.Serializer):
@@ -109,20 +124,22 @@ class FollowSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        user = self.context["request"].user
-        if not user.is_anonymous:
-            return Follow.objects.filter(user=user, author=obj.author).exists()
-        return False
+        if hasattr(obj, 'subscribed'):
+            return obj.subscribed
+        return obj.author_id in get_followed_author_ids(self.context)
 
     def get_recipes(self, obj):
         from app.serializers import RecipeFavoriteSerializer
-        request = self.context.get("request")
-        limit = request.GET.get("recipes_limit")
 
-        if not limit:
+        if hasattr(obj.author, 'recipes_preview'):
+            recipes = obj.author.recipes_preview
+        else:
+            request = self.context.get("request")
+            limit = request.GET.get("recipes_limit")
             recipes = obj.author.recipes_user.all()
 
-        recipes = obj.author.recipes_user.all()[: int(limit)]
+            if limit and limit.isdigit():
+                recipes = recipes[:int(limit)]
 
         return RecipeFavoriteSerializer(
             recipes,
@@ -130,6 +147,7 @@ class FollowSerializer(serializers.ModelSerializer):
             context=self.context
         ).data
 
-    @classmethod
-    def get_recipes_count(cls, obj):
-        return obj.author.recipes_user.all().count()
+    def get_recipes_count(self, obj):
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
+        return obj.author.recipes_user.count()
@@ -0,0 +1,40 @@
+import pytest
+from django.core.cache import cache
+from users.models import Follow
+
+SUBSCRIPTIONS_URL = '/api/users/subscriptions/'
+# COUNT, подписки с авторами и числом рецептов, рецепты авторов.
+SUBSCRIPTIONS_QUERIES = 3
+
+
+@pytest.fixture
+def subscribe(user):
+    def subscribe(authors):
+        cache.clear()
+        for author in authors:
+            Follow.objects.create(user=user, author=author)
+    return subscribe
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('recipes_limit', (None, 1, 3))
+@pytest.mark.parametrize('subscriptions', (1, 5))
+def test_subscriptions_query_count_is_constant(
+    user_client, authors, recipes, subscribe, django_assert_num_queries,
+    recipes_limit, subscriptions
+):
+    subscribe(authors[:subscriptions])
+    params = {'recipes_limit': recipes_limit} if recipes_limit else {}
+
+    with django_assert_num_queries(SUBSCRIPTIONS_QUERIES):
+        response = user_client.get(SUBSCRIPTIONS_URL, params)
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert len(results) == subscriptions
+    for item in results:
+        assert item['is_subscribed'] is True
+        assert item['recipes_count'] == len(recipes) // len(authors)
+        assert len(item['recipes']) == (
+            recipes_limit or len(recipes) // len(authors)
+        )
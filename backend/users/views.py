@@ -1,5 +1,10 @@
-from app.pagination import CustomPagination
+from app.models import Recipe
+from app.pagination import CustomPagination, FeedPagination
 from app.permissions import IsOwnerOrStaffOrReadOnly
+from app.serializers import BatchIdsSerializer
+from django.db import transaction
+from django.db.models import (BooleanField, Count, OuterRef, Prefetch,
+                              Subquery, Value)
 from djoser.views import UserViewSet
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
@@ -19,19 +24,40 @@ class FollowViewSet(viewsets.ModelViewSet):
     """
     queryset = Follow.objects.all()
     serializer_class = FollowSerializer
-    pagination_class = CustomPagination
+    pagination_class = FeedPagination
     http_method_names = ('get',)
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        review = Follow.objects.filter(user=self.request.user)
-        return review
+        recipes = Recipe.objects.only(
+            'id', 'name', 'image', 'thumbnails', 'image_status',
+            'cooking_time', 'author_id'
+        )
+        recipes_limit = self.request.query_params.get('recipes_limit')
+
+        if recipes_limit and recipes_limit.isdigit():
+            recipes = recipes.filter(
+                id__in=Subquery(
+                    Recipe.objects.filter(
+                        author=OuterRef('author')
+                    ).values('id')[:int(recipes_limit)]
+                )
+            )
 
-    def get_serializer_context(self):
-        context = super(FollowViewSet, self).get_serializer_context()
-        followers = Follow.objects.all()
-        context["follow"] = followers
-        return context
+        return Follow.objects.filter(
+            user=self.request.user
+        ).select_related(
+            'author'
+        ).annotate(
+            recipes_count=Count('author__recipes_user'),
+            subscribed=Value(True, output_field=BooleanField()),
+        ).prefetch_related(
+            Prefetch(
+                'author__recipes_user',
+                queryset=recipes,
+                to_attr='recipes_preview'
+            )
+        ).order_by('-id')
 
 
 class CustomUserViewSet(UserViewSet):
@@ -59,6 +85,62 @@ class CustomUserViewSet(UserViewSet):
             return FollowSerializer
         return CustomUserSerializer
 
+    @action(
+        detail=False,
+        methods=['post', 'delete'],
+        url_path='subscribe',
+        permission_classes=(permissions.IsAuthenticated,)
+    )
+    def subscribe_batch(self, request):
+        """
+        Функция пакетной подписки и отписки от пользователей
+        в одной транзакции.
+        """
+        serializer = BatchIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        current_user = request.user
+
+        if request.method == 'DELETE':
+            with transaction.atomic():
+                deleted, _ = Follow.objects.filter(
+                    user=current_user,
+                    author_id__in=ids
+                ).delete()
+            return Response({'deleted': deleted}, status=status.HTTP_200_OK)
+
+        if current_user.id in ids:
+            return Response(
+                {"error": "Вы не можете подписаться на себя."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            authors = list(User.objects.filter(id__in=ids))
+            missing = set(ids) - {author.id for author in authors}
+            if missing:
+                return Response(
+                    {'ids': [
+                        f'Пользователи не найдены: {sorted(missing)}.'
+                    ]},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            Follow.objects.bulk_create(
+                [
+                    Follow(user=current_user, author=author)
+                    for author in authors
+                ],
+                ignore_conflicts=True
+            )
+
+        serializer = CustomUserSerializer(
+            authors,
+            many=True,
+            context=self.get_serializer_context()
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     @action(
         detail=True,
         methods=['post', 'delete'],